@@ -19,7 +19,7 @@ try:
 except ImportError:
     from django.contrib.admin import ModelAdmin as ModelAdmin # pylint: disable=useless-import-alias
 
-from .models import Dialog, DialogScript, DialogScriptVersion, DialogStateTransition
+from .models import Dialog, DialogScript, DialogScriptVersion, DialogSnapshot, DialogStateTransition
 
 class PrettyJSONWidgetFixed(PrettyJSONWidget):
     def render(self, name, value, attrs=None, **kwargs):
@@ -27,9 +27,10 @@ class PrettyJSONWidgetFixed(PrettyJSONWidget):
 
 @admin.register(Dialog)
 class DialogAdmin(ModelAdmin):
-    list_display = ('key', 'script', 'current_state_id', 'started', 'finished', 'finish_reason',)
-    search_fields = ('key', 'dialog_snapshot', 'finish_reason', 'script__name',)
-    list_filter = ('started', 'finished', 'finish_reason')
+    list_display = ('key', 'script', 'current_state', 'last_transition_at', 'started', 'finished', 'finish_reason',)
+    search_fields = ('key', 'snapshot__definition', 'snapshot__content_hash', 'finish_reason', 'script__name',)
+    list_filter = ('started', 'finished', 'finish_reason', 'last_transition_at', 'current_state',)
+    readonly_fields = ('current_state', 'last_transition_at', 'last_transition', 'snapshot',)
 
     formfield_overrides = {
         JSONField: {'widget': PrettyJSONWidgetFixed(attrs={'initial': 'parsed'})}
@@ -114,6 +115,7 @@ class DialogScriptVersionAdmin(admin.ModelAdmin):
     list_display = ('dialog_script', 'name', 'identifier', 'updated')
     list_filter = ('updated', 'created', 'dialog_script', 'identifier')
     search_fields = ('name', 'identifier', 'definition', 'labels',)
+    readonly_fields = ('definition', 'content_hash', 'keyframe', 'delta',) # Later versions may be encoded against this one.
 
     formfield_overrides = {
         JSONField: {'widget': PrettyJSONWidgetFixed(attrs={'initial': 'parsed'})}
@@ -246,8 +248,19 @@ class DialogScriptAdmin(ModelAdmin):
 
 @admin.register(DialogStateTransition)
 class DialogStateTransitionAdmin(admin.ModelAdmin):
-    list_display = ('dialog', 'when', 'state_id', 'prior_state_id')
-    list_filter = ('when',)
+    list_display = ('dialog', 'when', 'state_id', 'prior_state_id', 'reason',)
+    list_filter = ('when', 'reason',)
+
+    formfield_overrides = {
+        JSONField: {'widget': PrettyJSONWidgetFixed(attrs={'initial': 'parsed'})}
+    }
+
+@admin.register(DialogSnapshot)
+class DialogSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'created',)
+    list_filter = ('created',)
+    search_fields = ('content_hash', 'definition',)
+    readonly_fields = ('content_hash',)
 
     formfield_overrides = {
         JSONField: {'widget': PrettyJSONWidgetFixed(attrs={'initial': 'parsed'})}
@@ -6,3 +6,8 @@ class DjangoDialogEngineAppConfig(AppConfig):
     name = 'django_dialog_engine'
     verbose_name = 'Dialog Engine'
     default_auto_field = 'django.db.models.BigAutoField'
+
+    def ready(self):
+        from .hooks import load_hooks # pylint: disable=import-outside-toplevel
+
+        load_hooks()
@@ -21,7 +21,9 @@ def incremental_backup(parameters):
     dumpdata_apps = (
         'django_dialog_engine.DialogScript',
         'django_dialog_engine.DialogStateTransition',
+        'django_dialog_engine.DialogSnapshot',
         'django_dialog_engine.Dialog',
+        'django_dialog_engine.DialogVariable',
     )
 
     prefix = 'django_dialog_engine_backup_' + settings.ALLOWED_HOSTS[0]
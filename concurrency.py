@@ -0,0 +1,78 @@
+# pylint: disable=line-too-long, useless-object-inheritance
+
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+CONCURRENCY_MODES = ('auto', 'lock', 'version', 'none',)
+
+class DialogConflictError(Exception):
+    pass
+
+class ContentionCounter(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+
+        self.events = {}
+
+    def increment(self, event):
+        with self.lock:
+            self.events[event] = self.events.get(event, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            return dict(self.events)
+
+    def clear(self):
+        with self.lock:
+            self.events.clear()
+
+CONTENTION = ContentionCounter()
+
+def concurrency_mode(using='default'):
+    mode = getattr(settings, 'DJANGO_DIALOG_ENGINE_CONCURRENCY', 'auto')
+
+    if (mode in CONCURRENCY_MODES) is False:
+        raise ValueError('Unknown DJANGO_DIALOG_ENGINE_CONCURRENCY mode: %s' % mode)
+
+    if mode == 'auto':
+        if connections[using].features.has_select_for_update:
+            return 'lock'
+
+        return 'version'
+
+    return mode
+
+def retry_delay(attempt):
+    backoff = getattr(settings, 'DJANGO_DIALOG_ENGINE_CONCURRENCY_BACKOFF', 0.05)
+
+    return backoff * (2 ** attempt) * (0.5 + random.random()) # nosec
+
+def record_contention(event, dialog_pk):
+    CONTENTION.increment(event)
+
+    logging.getLogger(__name__).info('Contention on dialog %s: %s', dialog_pk, event)
+
+def run_with_retries(operation, dialog_pk):
+    retries = getattr(settings, 'DJANGO_DIALOG_ENGINE_CONCURRENCY_RETRIES', 3)
+
+    attempt = 0
+
+    while True:
+        try:
+            return operation(attempt)
+        except DialogConflictError:
+            record_contention('conflict', dialog_pk)
+
+            if attempt >= retries:
+                CONTENTION.increment('exhausted')
+
+                raise
+
+            time.sleep(retry_delay(attempt))
+
+            attempt += 1
@@ -1,8 +1,14 @@
 # pylint: disable=line-too-long
 
-from .dialog_machine import DialogMachine, MISSING_NEXT_NODE_KEY
+from .dialog_machine import DialogMachine, MISSING_NEXT_NODE_KEY, MACHINE_CACHE, cached_dialog_machine, definition_hash, keyed_dialog_machine
 
-from .base_node import DialogError, MissingNextDialogNodeError, BaseNode, DialogTransition
+from .definition_delta import apply_definition_delta, definition_delta
+
+from .template_cache import TEMPLATE_CACHE, fetch_template, fetch_dialog_template, is_template, precompile_templates
+
+from .weighted_sampling import RANDOM_STATE_KEY, AliasTable, PythonSampler, NumpySampler, random_sampler, next_random_generator
+
+from .base_node import DialogError, MissingNextDialogNodeError, BaseNode, DialogTransition, NODE_TYPES, register_node_type, node_class_for_type
 
 from .alert_node import AlertNode
 from .begin_node import BeginNode
@@ -24,3 +30,24 @@ from .random_branch_node import RandomBranchNode
 from .record_variable_node import RecordVariableNode
 from .time_elapsed_interrupt_node import TimeElapsedInterruptNode
 from .update_variable_node import UpdateVariableNode
+
+register_node_type('alert', AlertNode)
+register_node_type('begin', BeginNode)
+register_node_type('branch-conditions', BranchingConditionsNode)
+register_node_type('branch-prompt', BranchingPromptNode)
+register_node_type('custom', CustomNode)
+register_node_type('echo', EchoNode)
+register_node_type('embed-dialog', EmbedDialogNode)
+register_node_type('end', EndNode)
+register_node_type('external-choice', ExternalChoiceNode)
+register_node_type('http-response', HttpResponseBranchNode)
+register_node_type('if', IfNode)
+register_node_type('interrupt', InterruptNode)
+register_node_type('interrupt-resume', InterruptResumeNode)
+register_node_type('loop', LoopNode)
+register_node_type('pause', PauseNode)
+register_node_type('prompt', PromptNode)
+register_node_type('random-branch', RandomBranchNode)
+register_node_type('record-variable', RecordVariableNode)
+register_node_type('time-elapsed-interrupt', TimeElapsedInterruptNode)
+register_node_type('update-variable', UpdateVariableNode)
@@ -1,4 +1,8 @@
-# pylint: disable=useless-object-inheritance
+# pylint: disable=useless-object-inheritance, line-too-long
+
+import json
+import logging
+import re
 
 class DialogError(Exception):
     pass
@@ -10,6 +14,46 @@ class MissingNextDialogNodeError(DialogError):
         self.container = container
         self.key = key
 
+NODE_TYPES = {}
+
+def register_node_type(node_type, node_class):
+    NODE_TYPES[node_type] = node_class
+
+def node_class_for_type(node_type, node_def=None):
+    node_class = NODE_TYPES.get(node_type, None)
+
+    if node_class is not None or node_def is None:
+        return node_class
+
+    # Fall back to probing unregistered subclasses (older extensions) once, then remember the type.
+
+    registered = list(NODE_TYPES.values())
+
+    for cls in BaseNode.__subclasses__():
+        if node_class is None and (cls in registered) is False:
+            try:
+                if cls.parse(node_def) is not None:
+                    node_class = cls
+            except MissingNextDialogNodeError:
+                node_class = cls
+
+    if node_class is not None:
+        logging.getLogger(__name__).warning('Dialog node type "%s" is not registered. Call register_node_type("%s", %s) from your dialog_api module.', node_type, node_type, node_class.__name__)
+
+        register_node_type(node_type, node_class)
+
+    return node_class
+
+def parse_node(node_def):
+    node_type = node_def.get('type', None)
+
+    node_class = node_class_for_type(node_type, node_def)
+
+    if node_class is None:
+        raise DialogError('Unknown dialog node type "%s": %s' % (node_type, json.dumps(node_def, indent=2)))
+
+    return node_class.parse(node_def)
+
 class BaseNode(object):
     def __init__(self, node_id, next_node_id=None):
         self.node_id = node_id
@@ -27,10 +71,23 @@ class BaseNode(object):
     def actions(self):
         raise DialogError('Unimplemented method: actions. Class: ' + self.__class__.__name__)
 
+    def wakeup_seconds(self): # pylint: disable=no-self-use
+        return None # Seconds after entering this node when it may transition without a response.
+
     @staticmethod
     def parse(dialog_def): # pylint: disable=unused-argument
         return None
 
+    def compile_pattern(self, pattern, flags=0):
+        # Invalid patterns never match - DialogScript.issues() reports them (see dialog_api.identify_script_issues).
+
+        try:
+            return re.compile(pattern, flags)
+        except (re.error, TypeError) as ex:
+            logging.getLogger(__name__).warning('Skipping invalid pattern in node "%s": %s (%s)', self.node_id, pattern, ex)
+
+        return None
+
     def next_nodes(self):
         nodes = []
 
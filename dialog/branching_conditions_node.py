@@ -1,10 +1,56 @@
-# pylint: disable=line-too-long, super-with-arguments, eval-used
+# pylint: disable=line-too-long, super-with-arguments, eval-used, useless-object-inheritance
 
+import ast
 import traceback
 
+from six.moves import builtins
+
 from .base_node import BaseNode, DialogError
 from .dialog_machine import DialogTransition
 
+BUILTIN_NAMES = frozenset(dir(builtins))
+
+class CompiledCondition(object):
+    def __init__(self, condition):
+        self.condition = condition
+
+        self.code = None
+        self.error = None
+
+        self.free_names = frozenset()
+        self.is_name = False
+
+        try:
+            tree = ast.parse(condition.strip(' \t'), '<string>', 'eval')
+
+            self.code = compile(tree, '<string>', 'eval')
+
+            loaded = set()
+            bound = set()
+
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Name):
+                    if isinstance(node.ctx, ast.Load):
+                        loaded.add(node.id)
+                    else:
+                        bound.add(node.id) # Comprehension targets, walrus assignments
+                elif isinstance(node, ast.arg):
+                    bound.add(node.arg) # Lambda arguments
+
+            self.free_names = frozenset(loaded - bound - BUILTIN_NAMES)
+            self.is_name = isinstance(tree.body, ast.Name)
+        except (SyntaxError, ValueError, TypeError, AttributeError) as ex:
+            self.error = ex
+
+    def missing_names(self, variables):
+        return [name for name in self.free_names if (name in variables) is False]
+
+    def evaluate(self, namespace, variables):
+        if self.error is not None:
+            raise DialogError('Unable to compile condition: %s --- %s' % (self.condition, self.error))
+
+        return eval(self.code, namespace, variables) # nosec
+
 class BranchingConditionsNode(BaseNode):
     @staticmethod
     def parse(dialog_def):
@@ -17,6 +63,8 @@ class BranchingConditionsNode(BaseNode):
             if 'error' in dialog_def:
                 branch_node.error_node = dialog_def['error']
 
+            branch_node.compile_conditions()
+
             return branch_node
 
         return None
@@ -32,6 +80,16 @@ class BranchingConditionsNode(BaseNode):
         else:
             self.conditional_actions = actions
 
+        self.compiled_conditions = None
+
+    def compile_conditions(self):
+        self.compiled_conditions = []
+
+        for conditional_action in self.conditional_actions:
+            self.compiled_conditions.append(CompiledCondition(conditional_action['condition']))
+
+        return self.compiled_conditions
+
     def node_type(self):
         return 'branch-conditions'
 
@@ -81,45 +139,31 @@ class BranchingConditionsNode(BaseNode):
         if extras is None:
             extras = {}
 
-        try:
-            for conditional_action in self.conditional_actions:
-                if extras is None:
-                    extras = {}
+        compiled_conditions = self.compiled_conditions
 
-                local_env = extras.copy()
-                local_env['logger'] = logger
+        if compiled_conditions is None:
+            compiled_conditions = self.compile_conditions()
 
-                try:
-                    result = eval(conditional_action['condition'], {}, extras) # nosec
+        namespace = {} # Shared by every condition in this evaluation
 
-                    if result: # nosec # pylint: disable=eval-used
-                        transition = DialogTransition(new_state_id=conditional_action['action'])
-
-                        transition.metadata['reason'] = 'matched-condition'
-                        transition.metadata['condition'] = conditional_action['condition']
-                        transition.metadata['exit_actions'] = []
+        try:
+            for conditional_action, condition in zip(self.conditional_actions, compiled_conditions):
+                if condition.is_name and condition.missing_names(extras): # Undefined variable
+                    transition = DialogTransition(new_state_id=self.no_match_node_id)
+                    transition.metadata['reason'] = 'no-matching-conditions'
 
-                        return transition
-                except NameError as name_exc:
-                    test_condition = conditional_action['condition']
-                    test_condition = test_condition.replace('(', ' ')
-                    test_condition = test_condition.replace(')', ' ')
-                    test_condition = test_condition.replace('.', ' ')
-                    test_condition = test_condition.replace('[', ' ')
-                    test_condition = test_condition.replace(']', ' ')
-                    test_condition = test_condition.replace('=', ' ')
-                    test_condition = test_condition.replace('>', ' ')
-                    test_condition = test_condition.replace('<', ' ')
+                    return transition
 
-                    tokens = test_condition.split(' ')
+                # Other undefined names raise NameError and follow the error path, as before.
 
-                    if len(tokens) == 1: # Undefined variable
-                        transition = DialogTransition(new_state_id=self.no_match_node_id)
-                        transition.metadata['reason'] = 'no-matching-conditions'
+                if condition.evaluate(namespace, extras):
+                    transition = DialogTransition(new_state_id=conditional_action['action'])
 
-                        return transition
+                    transition.metadata['reason'] = 'matched-condition'
+                    transition.metadata['condition'] = conditional_action['condition']
+                    transition.metadata['exit_actions'] = []
 
-                    raise DialogError('Error in condition: %s --- %s' % (conditional_action['condition'], name_exc)) # pylint: disable=raise-missing-from
+                    return transition
         except: # pylint: disable=bare-except
             traceback.print_exc()
 
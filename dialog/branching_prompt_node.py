@@ -14,7 +14,7 @@ from django.utils import timezone
 from .base_node import BaseNode
 from .dialog_machine import DialogTransition
 
-class BranchingPromptNode(BaseNode):
+class BranchingPromptNode(BaseNode): # pylint: disable=too-many-instance-attributes
     @staticmethod
     def parse(dialog_def):
         if dialog_def['type'] == 'branch-prompt':
@@ -42,6 +42,8 @@ class BranchingPromptNode(BaseNode):
                 if 'timeout_iterations' in dialog_def:
                     prompt_node.timeout_iterations = dialog_def['timeout_iterations']
 
+            prompt_node.compile_patterns()
+
             return prompt_node
 
         return None
@@ -60,6 +62,8 @@ class BranchingPromptNode(BaseNode):
         else:
             self.pattern_actions = actions
 
+        self.compiled_patterns = None
+
         self.timeout = timeout
         self.timeout_node_id = timeout_node_id
         self.timeout_iterations = timeout_iterations
@@ -67,6 +71,12 @@ class BranchingPromptNode(BaseNode):
     def node_type(self):
         return 'branch-prompt'
 
+    def compile_patterns(self):
+        self.compiled_patterns = []
+
+        for action in self.pattern_actions:
+            self.compiled_patterns.append(self.compile_pattern(action['pattern'], re.IGNORECASE))
+
     def prefix_nodes(self, prefix):
         super().prefix_nodes(prefix) # pylint: disable=missing-super-argument
 
@@ -131,8 +141,11 @@ class BranchingPromptNode(BaseNode):
 
             test_response = test_response.strip()
 
-            for action in self.pattern_actions:
-                if matched_action is None and re.search(action['pattern'], test_response, re.IGNORECASE) is not None:
+            if self.compiled_patterns is None:
+                self.compile_patterns()
+
+            for action, pattern in zip(self.pattern_actions, self.compiled_patterns):
+                if matched_action is None and pattern is not None and pattern.search(test_response) is not None:
                     matched_action = action
 
             if isinstance(response, UserDict):
@@ -177,9 +190,9 @@ class BranchingPromptNode(BaseNode):
                 can_timeout = True
 
                 if self.timeout_iterations is not None:
-                    prior_timeouts = dialog.prior_transitions(new_state_id=self.timeout_node_id, prior_state_id=self.node_id, reason='timeout')
+                    prior_timeouts = dialog.count_prior_transitions(new_state_id=self.timeout_node_id, prior_state_id=self.node_id, reason='timeout')
 
-                    if len(prior_timeouts) >= self.timeout_iterations:
+                    if prior_timeouts >= self.timeout_iterations:
                         can_timeout = False
 
                 if can_timeout:
@@ -203,6 +216,12 @@ class BranchingPromptNode(BaseNode):
 
         return None
 
+    def wakeup_seconds(self):
+        if self.timeout_node_id is not None:
+            return self.timeout
+
+        return None
+
     def actions(self):
         return[{
             'type': 'echo',
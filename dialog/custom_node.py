@@ -1,16 +1,25 @@
 # pylint: disable=line-too-long, super-with-arguments, eval-used
 
-import importlib
+import copy
+import hashlib
 import logging
 import traceback
 
 from six import string_types
 
-from django.conf import settings
 from django.utils.encoding import smart_str
 
+from ..hooks import hooks_for
 from .base_node import BaseNode, DialogError
 from .dialog_machine import DialogTransition
+from .lru_cache import LRUCache
+
+CODE_CACHE = LRUCache('DJANGO_DIALOG_ENGINE_CODE_CACHE_SIZE', 1024)
+
+def compile_script(source):
+    source_hash = hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    return CODE_CACHE.fetch(source_hash, lambda: compile(source, '<string>', 'exec'))
 
 class CustomNode(BaseNode):
     @staticmethod
@@ -27,6 +36,18 @@ class CustomNode(BaseNode):
         self.evaluate_script = evaluate_script
         self.actions_script = actions_script
 
+        self.compiled_scripts = {}
+
+    def compiled_script(self, source):
+        compiled = self.compiled_scripts.get(source, None)
+
+        if compiled is None:
+            compiled = compile_script(source)
+
+            self.compiled_scripts[source] = compiled
+
+        return compiled
+
     def node_type(self):
         return 'custom'
 
@@ -66,7 +87,7 @@ class CustomNode(BaseNode):
             response = smart_str(response)
 
         local_env = {
-            'definition': self.definition,
+            'definition': copy.deepcopy(self.definition), # Node objects are shared by every dialog using a cached machine.
             'response': response,
             'last_transition': last_transition_date,
             'previous_state': previous_state,
@@ -75,18 +96,16 @@ class CustomNode(BaseNode):
             'logger': logger
         }
 
-        for app in settings.INSTALLED_APPS:
+        for update_environment in hooks_for('update_custom_node_environment'):
             try:
-                app_dialog_api = importlib.import_module(app + '.dialog_api')
-
-                app_dialog_api.update_custom_node_environment(local_env)
+                update_environment(local_env)
             except ImportError:
                 pass
             except AttributeError:
                 pass
 
         try:
-            code = compile(smart_str(self.evaluate_script), '<string>', 'exec')
+            code = self.compiled_script(smart_str(self.evaluate_script))
 
             eval(code, {}, local_env) # nosec # pylint: disable=eval-used
 
@@ -121,11 +140,11 @@ class CustomNode(BaseNode):
         logger = logging.getLogger(__name__)
 
         try:
-            code = compile(self.actions_script, '<string>', 'exec')
+            code = self.compiled_script(self.actions_script)
 
             custom_actions = []
 
-            eval(code, {}, {'definition': self.definition, 'actions': custom_actions}) #nosec B307
+            eval(code, {}, {'definition': copy.deepcopy(self.definition), 'actions': custom_actions}) #nosec B307
 
             for action in custom_actions:
                 if isinstance(action['type'], string_types) is False:
@@ -0,0 +1,50 @@
+# pylint: disable=line-too-long
+
+import copy
+
+from six import string_types
+
+def index_nodes(definition):
+    if isinstance(definition, list) is False:
+        return None
+
+    nodes = {}
+
+    for node in definition:
+        if isinstance(node, dict) is False or isinstance(node.get('id', None), string_types) is False or node['id'] in nodes:
+            return None # Only well-formed definitions with unique node ids are delta-encoded.
+
+        nodes[node['id']] = node
+
+    return nodes
+
+def definition_delta(base, definition):
+    base_nodes = index_nodes(base)
+    nodes = index_nodes(definition)
+
+    if base_nodes is None or nodes is None:
+        return None
+
+    changed = {}
+
+    for node_id, node in nodes.items():
+        if base_nodes.get(node_id, None) != node:
+            changed[node_id] = node
+
+    return {
+        'order': [node['id'] for node in definition],
+        'nodes': changed,
+    }
+
+def apply_definition_delta(base, delta):
+    base_nodes = index_nodes(base)
+
+    definition = []
+
+    for node_id in delta['order']:
+        if node_id in delta['nodes']:
+            definition.append(copy.deepcopy(delta['nodes'][node_id]))
+        else:
+            definition.append(copy.deepcopy(base_nodes[node_id]))
+
+    return definition
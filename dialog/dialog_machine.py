@@ -1,17 +1,47 @@
 # pylint: disable=line-too-long, useless-object-inheritance, super-with-arguments
 
 import copy
-import importlib
+import datetime
+import hashlib
 import logging
 import json
 
 from django.conf import settings
+from django.utils import timezone
 
-from .base_node import BaseNode, MissingNextDialogNodeError, DialogError, DialogTransition
+from ..hooks import load_hooks
+from .base_node import MissingNextDialogNodeError, DialogError, DialogTransition, parse_node
+from .lru_cache import LRUCache
+from .template_cache import precompile_templates
+from .weighted_sampling import next_random_generator
 
 MISSING_NEXT_NODE_KEY = 'django-dialog-engine-missing-next-node-end'
 
-class DialogMachine: # pylint: disable=old-style-class
+def definition_hash(definition):
+    canonical = json.dumps(definition, sort_keys=True, separators=(',', ':'))
+
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+MACHINE_CACHE = LRUCache('DJANGO_DIALOG_ENGINE_MACHINE_CACHE_SIZE', 64)
+
+def compile_dialog_machine(definition):
+    template = DialogMachine(definition)
+    template.shared = True
+
+    if getattr(settings, 'DJANGO_DIALOG_ENGINE_PRECOMPILE_TEMPLATES', False):
+        precompile_templates(definition)
+
+    return template
+
+def keyed_dialog_machine(cache_key, load_definition, metadata=None, django_object=None):
+    template = MACHINE_CACHE.fetch(cache_key, lambda: compile_dialog_machine(load_definition()))
+
+    return template.layer(metadata, django_object=django_object)
+
+def cached_dialog_machine(definition, metadata=None, django_object=None):
+    return keyed_dialog_machine(definition_hash(definition), lambda: definition, metadata, django_object=django_object)
+
+class DialogMachine: # pylint: disable=old-style-class, too-many-instance-attributes
     def __init__(self, definition, metadata=None, django_object=None):
         from .begin_node import BeginNode # pylint: disable=import-outside-toplevel
         from .end_node import EndNode # pylint: disable=import-outside-toplevel
@@ -22,6 +52,8 @@ class DialogMachine: # pylint: disable=old-style-class
         self.current_node = None
         self.start_node = None
 
+        self.shared = False
+
         self.django_object = django_object
 
         if metadata is None:
@@ -29,51 +61,116 @@ class DialogMachine: # pylint: disable=old-style-class
 
         self.metadata = metadata
 
-        for app in settings.INSTALLED_APPS:
-            try:
-                importlib.import_module(app + '.dialog_api')
-            except ImportError:
-                pass
-            except AttributeError:
-                pass
+        load_hooks() # Extensions register their node types when their dialog_api modules load.
 
         for node_def in definition:
-            node = None
-
-            for cls in BaseNode.__subclasses__():
-                if node is None:
-                    try:
-                        node = cls.parse(node_def)
-                    except MissingNextDialogNodeError as missing_node:
-                        # Automatically add end nodes to dangling node pointers
-
-                        if ('' in self.all_nodes) is False:
-                            end_node_def = {
-                                'type': 'end',
-                                'id': MISSING_NEXT_NODE_KEY
-                            }
+            try:
+                node = parse_node(node_def)
+            except MissingNextDialogNodeError as missing_node:
+                # Automatically add end nodes to dangling node pointers
 
-                            end_node = EndNode.parse(end_node_def)
+                if (MISSING_NEXT_NODE_KEY in self.all_nodes) is False:
+                    end_node_def = {
+                        'type': 'end',
+                        'id': MISSING_NEXT_NODE_KEY
+                    }
 
-                            end_node.definition = end_node_def
+                    end_node = EndNode.parse(end_node_def)
 
-                            self.all_nodes[end_node.node_id] = end_node
+                    end_node.definition = end_node_def
 
-                        missing_node.container[missing_node.key] = MISSING_NEXT_NODE_KEY
+                    self.all_nodes[end_node.node_id] = end_node
 
-                        node = cls.parse(node_def)
+                missing_node.container[missing_node.key] = MISSING_NEXT_NODE_KEY
 
-                    if node is not None and 'name' in node_def:
-                        node.node_name = node_def['name']
-                        node.definition = node_def
+                node = parse_node(node_def)
 
             if node is None:
                 raise DialogError('Unable to parse node definition: ' + json.dumps(node_def, indent=2))
 
+            if 'name' in node_def:
+                node.node_name = node_def['name']
+                node.definition = node_def
+
             self.all_nodes[node.node_id] = node
 
             if self.current_node is None and isinstance(node, BeginNode):
                 self.current_node = node
+                self.start_node = node
+
+        self.index_interrupts()
+
+    def index_interrupts(self):
+        from .interrupt_node import InterruptNode # pylint: disable=import-outside-toplevel
+        from .time_elapsed_interrupt_node import TimeElapsedInterruptNode # pylint: disable=import-outside-toplevel
+
+        self.interrupt_patterns = []
+        self.time_elapsed_nodes = []
+        self.time_elapsed_threshold = None
+
+        for position, node in enumerate(self.all_nodes.values()):
+            if isinstance(node, (InterruptNode,)):
+                for match_pattern, compiled in node.pattern_matchers():
+                    self.interrupt_patterns.append((position, node, match_pattern, compiled))
+            elif isinstance(node, (TimeElapsedInterruptNode,)):
+                self.time_elapsed_nodes.append((position, node))
+
+                if self.time_elapsed_threshold is None or node.elapsed_seconds < self.time_elapsed_threshold:
+                    self.time_elapsed_threshold = node.elapsed_seconds
+
+    def due_time_elapsed_nodes(self, last_transition):
+        if last_transition is None or self.time_elapsed_threshold is None:
+            return []
+
+        if (timezone.now() - last_transition.dialog.started).total_seconds() < self.time_elapsed_threshold:
+            return [] # Earliest threshold not yet reached.
+
+        return self.time_elapsed_nodes
+
+    def matching_interrupt(self, response):
+        if response is None:
+            return None
+
+        for position, node, match_pattern, compiled in self.interrupt_patterns:
+            if compiled.search(response) is not None:
+                return (position, node, match_pattern)
+
+        return None
+
+    def next_wakeup(self, state_entered, started, now, include_due=False):
+        wakeups = []
+
+        if self.current_node is not None and state_entered is not None:
+            seconds = self.current_node.wakeup_seconds()
+
+            if seconds is not None:
+                wakeup = state_entered + datetime.timedelta(seconds=seconds)
+
+                if include_due or wakeup > now:
+                    wakeups.append(wakeup)
+
+        for position, node in self.time_elapsed_nodes: # pylint: disable=unused-variable
+            fire_time = node.fire_time(started)
+
+            if fire_time is not None and fire_time > now: # Due interrupts were checked by the last evaluation.
+                wakeups.append(fire_time)
+
+        if wakeups:
+            return min(wakeups)
+
+        return None
+
+    def layer(self, metadata=None, django_object=None):
+        machine = copy.copy(self)
+
+        if metadata is None:
+            metadata = {}
+
+        machine.metadata = metadata
+        machine.django_object = django_object
+        machine.current_node = self.start_node
+
+        return machine
 
     def advance_to(self, node_id):
         try:
@@ -82,9 +179,6 @@ class DialogMachine: # pylint: disable=old-style-class
             pass # Cannot continue - stay in same place.
 
     def evaluate(self, response=None, last_transition=None, extras=None, logger=None): # pylint: disable=too-many-branches
-        from .interrupt_node import InterruptNode # pylint: disable=import-outside-toplevel
-        from .time_elapsed_interrupt_node import TimeElapsedInterruptNode # pylint: disable=import-outside-toplevel
-
         if extras is None:
             extras = {}
 
@@ -94,32 +188,37 @@ class DialogMachine: # pylint: disable=old-style-class
         if logger is None:
             logger = logging.getLogger()
 
-        for key, node in self.all_nodes.items(): # pylint: disable=unused-variable
-            if response is not None and isinstance(node, (InterruptNode,)):
-                pattern_matched = node.matches(response)
+        matched_interrupt = self.matching_interrupt(response)
 
-                if pattern_matched is not None:
-                    transition = DialogTransition(new_state_id=node.node_id)
+        for position, node in self.due_time_elapsed_nodes(last_transition):
+            if matched_interrupt is not None and position > matched_interrupt[0]:
+                break # Keyword interrupt precedes remaining time-elapsed interrupts.
 
-                    transition.metadata['reason'] = 'interrupt'
-                    transition.metadata['pattern'] = 'pattern_matched'
-                    transition.metadata['response'] = response
-                    transition.metadata['actions'] = [{
-                        'type': 'store-value',
-                        'key': 'keyword_interrupt_pattern_match',
-                        'value': pattern_matched
-                    }]
+            if node.should_fire(last_transition):
+                transition = DialogTransition(new_state_id=node.node_id)
 
-                    return transition
-            elif isinstance(node, (TimeElapsedInterruptNode,)):
-                if node.should_fire(last_transition):
-                    transition = DialogTransition(new_state_id=node.node_id)
+                transition.metadata['reason'] = 'time-elapsed-interrupt'
+                transition.metadata['hours_elapsed'] = node.hours_elapsed
+                transition.metadata['minutes_elapsed'] = node.minutes_elapsed
+
+                return transition
+
+        if matched_interrupt is not None:
+            node = matched_interrupt[1]
+            pattern_matched = matched_interrupt[2]
 
-                    transition.metadata['reason'] = 'time-elapsed-interrupt'
-                    transition.metadata['hours_elapsed'] = node.hours_elapsed
-                    transition.metadata['minutes_elapsed'] = node.minutes_elapsed
+            transition = DialogTransition(new_state_id=node.node_id)
 
-                    return transition
+            transition.metadata['reason'] = 'interrupt'
+            transition.metadata['pattern'] = 'pattern_matched'
+            transition.metadata['response'] = response
+            transition.metadata['actions'] = [{
+                'type': 'store-value',
+                'key': 'keyword_interrupt_pattern_match',
+                'value': pattern_matched
+            }]
+
+            return transition
 
         logger.debug('Evaluating current node: %s -- Response: %s -- Extras: %s -- Logger: %s', self.current_node, response, len(extras), logger)
         transition = self.current_node.evaluate(self, response, last_transition, extras, logger)
@@ -149,6 +248,18 @@ class DialogMachine: # pylint: disable=old-style-class
 
         return []
 
+    def count_prior_transitions(self, new_state_id, prior_state_id, reason=None):
+        if self.django_object is not None:
+            return self.django_object.count_prior_transitions(new_state_id, prior_state_id, reason)
+
+        return 0
+
+    def get_value(self, key):
+        if self.django_object is not None:
+            return self.django_object.get_value(key)
+
+        return self.metadata.get('values', {}).get(key, None)
+
     def pop_value(self, key):
         if self.django_object is not None:
             return self.django_object.pop_value(key)
@@ -159,6 +270,12 @@ class DialogMachine: # pylint: disable=old-style-class
         if self.django_object is not None:
             self.django_object.push_value(key, value)
 
+    def random_generator(self):
+        if self.django_object is not None:
+            return self.django_object.random_generator()
+
+        return next_random_generator(self.metadata)
+
     def actions_for_state(self, state_id):
         actions = self.all_nodes[state_id].actions()
 
@@ -179,6 +296,9 @@ class DialogMachine: # pylint: disable=old-style-class
         return self.all_nodes.get(node_id, None)
 
     def prefix_nodes(self, prefix):
+        if self.shared:
+            raise DialogError('Unable to prefix nodes of a cached dialog machine. Create a new DialogMachine instead.')
+
         node_keys = list(self.all_nodes.keys())
 
         for key in node_keys:
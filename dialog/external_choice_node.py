@@ -108,6 +108,12 @@ class ExternalChoiceNode(BaseNode):
 
         return None
 
+    def wakeup_seconds(self):
+        if self.timeout_node_id is not None:
+            return self.timeout
+
+        return None
+
     def actions(self):
         available_choices = {
             'type': 'external-choice',
@@ -1,6 +1,5 @@
 # pylint: disable=line-too-long, super-with-arguments, no-member
 
-import re
 import traceback
 
 import lxml # nosec
@@ -50,6 +49,8 @@ class HttpResponseBranchNode(BaseNode): # pylint: disable=too-many-instance-attr
             else:
                 prompt_node.pattern_matcher = 're'
 
+            prompt_node.compile_patterns()
+
             return prompt_node
 
         return None
@@ -81,6 +82,15 @@ class HttpResponseBranchNode(BaseNode): # pylint: disable=too-many-instance-attr
         self.parameters = parameters
         self.pattern_matcher = pattern_matcher
 
+        self.compiled_patterns = None
+
+    def compile_patterns(self):
+        self.compiled_patterns = []
+
+        if self.pattern_matcher == 're':
+            for action in self.pattern_actions:
+                self.compiled_patterns.append(self.compile_pattern(action['pattern']))
+
     def prefix_nodes(self, prefix):
         super().prefix_nodes(prefix) # pylint: disable=missing-super-argument
 
@@ -175,8 +185,11 @@ class HttpResponseBranchNode(BaseNode): # pylint: disable=too-many-instance-attr
                 matched_action = None
 
                 if self.pattern_matcher == 're':
-                    for action in self.pattern_actions:
-                        if re.search(action['pattern'], response.text) is not None:
+                    if self.compiled_patterns is None:
+                        self.compile_patterns()
+
+                    for action, pattern in zip(self.pattern_actions, self.compiled_patterns):
+                        if pattern is not None and pattern.search(response.text) is not None:
                             matched_action = action
 
                 elif self.pattern_matcher == 'jsonpath':
@@ -42,11 +42,7 @@ class IfNode(BaseNode):
         for condition in self.all_true:
             key = condition['key']
 
-            value = None
-
-            if 'values' in dialog.metadata:
-                if key in dialog.metadata['values']:
-                    value = dialog.metadata['values'][key]
+            value = dialog.get_value(key)
 
             if value is None:
                 raise DialogError('No value for "%s" in dialog metadata. The ordering of the dialog may be incorrect!' % key)
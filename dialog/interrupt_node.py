@@ -10,6 +10,8 @@ class InterruptNode(BaseNode):
         if dialog_def['type'] == 'interrupt':
             interrupt_node = InterruptNode(dialog_def['id'], dialog_def['match_patterns'], dialog_def['next_id'])
 
+            interrupt_node.compile_patterns()
+
             return interrupt_node
 
         return None
@@ -22,9 +24,23 @@ class InterruptNode(BaseNode):
         else:
             self.match_patterns = match_patterns
 
+        self.compiled_patterns = None
+
     def node_type(self):
         return 'interrupt'
 
+    def compile_patterns(self):
+        self.compiled_patterns = []
+
+        for match_pattern in self.match_patterns:
+            self.compiled_patterns.append(self.compile_pattern(match_pattern, re.IGNORECASE))
+
+    def pattern_matchers(self):
+        if self.compiled_patterns is None:
+            self.compile_patterns()
+
+        return [(match_pattern, compiled) for match_pattern, compiled in zip(self.match_patterns, self.compiled_patterns) if compiled is not None]
+
     def node_definition(self):
         node_def = super().node_definition() # pylint: disable=missing-super-argument
 
@@ -51,8 +67,8 @@ class InterruptNode(BaseNode):
         if response is None:
             return None
 
-        for match_pattern in self.match_patterns:
-            if re.search(match_pattern, response, re.IGNORECASE) is not None:
+        for match_pattern, compiled in self.pattern_matchers():
+            if compiled.search(response) is not None:
                 return match_pattern
 
         return None
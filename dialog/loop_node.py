@@ -19,7 +19,7 @@ class LoopNode(BaseNode):
         loop_count = 0
 
         if last_transition is not None:
-            loop_count = last_transition.dialog.transitions.filter(state_id=self.node_id).count()
+            loop_count = last_transition.dialog.count_transitions(self.node_id)
 
         if loop_count < self.iterations:
             transition = DialogTransition(new_state_id=self.loop_node_id)
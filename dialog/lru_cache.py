@@ -0,0 +1,68 @@
+# pylint: disable=useless-object-inheritance
+
+import collections
+import threading
+
+from django.conf import settings
+
+class LRUCache(object):
+    def __init__(self, size_setting, default_size):
+        self.size_setting = size_setting
+        self.default_size = default_size
+
+        self.items = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def max_size(self):
+        return getattr(settings, self.size_setting, self.default_size)
+
+    def fetch(self, key, create):
+        max_size = self.max_size()
+
+        if max_size is None or max_size <= 0:
+            return create()
+
+        with self.lock:
+            item = self.items.get(key, None)
+
+            if item is not None:
+                self.items.move_to_end(key)
+                self.hits += 1
+
+                return item
+
+        item = create()
+
+        with self.lock:
+            self.misses += 1
+
+            self.items[key] = item
+            self.items.move_to_end(key)
+
+            while len(self.items) > max_size:
+                self.items.popitem(last=False)
+                self.evictions += 1
+
+        return item
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.items),
+                'max_size': self.max_size(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
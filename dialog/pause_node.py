@@ -40,6 +40,9 @@ class PauseNode(BaseNode):
 
         return None
 
+    def wakeup_seconds(self):
+        return self.duration
+
     def actions(self):
         return [{
             'type': 'pause',
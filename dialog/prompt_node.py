@@ -1,7 +1,5 @@
 # pylint: disable=line-too-long, super-with-arguments
 
-import re
-
 from django.utils import timezone
 
 from .base_node import BaseNode
@@ -26,6 +24,8 @@ class PromptNode(BaseNode):
             if 'valid_patterns' in dialog_def:
                 prompt_node.valid_patterns = dialog_def['valid_patterns']
 
+            prompt_node.compile_patterns()
+
             return prompt_node
 
         return None
@@ -44,9 +44,17 @@ class PromptNode(BaseNode):
         else:
             self.valid_patterns = valid_patterns
 
+        self.compiled_patterns = None
+
     def node_type(self):
         return 'prompt'
 
+    def compile_patterns(self):
+        self.compiled_patterns = []
+
+        for pattern in self.valid_patterns:
+            self.compiled_patterns.append(self.compile_pattern(pattern))
+
     def prefix_nodes(self, prefix):
         super().prefix_nodes(prefix) # pylint: disable=missing-super-argument
 
@@ -99,8 +107,11 @@ class PromptNode(BaseNode):
             else:
                 valid_response = True
 
-            for pattern in self.valid_patterns:
-                if re.match(pattern, response) is not None:
+            if self.compiled_patterns is None:
+                self.compile_patterns()
+
+            for pattern in self.compiled_patterns:
+                if pattern is not None and pattern.match(response) is not None:
                     valid_response = True
 
             if valid_response is False:
@@ -134,6 +145,12 @@ class PromptNode(BaseNode):
 
         return transition
 
+    def wakeup_seconds(self):
+        if self.timeout_node_id is not None:
+            return self.timeout
+
+        return None
+
     def actions(self):
         return[{
             'type': 'echo',
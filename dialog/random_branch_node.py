@@ -1,15 +1,15 @@
 # pylint: disable=line-too-long, super-with-arguments, no-member
 
-import copy
 import json
 
-import numpy
 import six
 
-from django.template import Template, Context
+from django.template import Context
 
 from .base_node import BaseNode
 from .dialog_machine import DialogTransition
+from .template_cache import fetch_template, is_template
+from .weighted_sampling import AliasTable, random_sampler
 
 class RandomBranchNode(BaseNode):
     @staticmethod
@@ -31,6 +31,30 @@ class RandomBranchNode(BaseNode):
 
         self.without_replacement = without_replacement
 
+        self.index_weights()
+
+    def index_weights(self):
+        self.constant_weights = []
+
+        for action in self.random_actions:
+            raw_weight = '%s' % action['weight']
+
+            if is_template(raw_weight):
+                self.constant_weights.append(None)
+            else:
+                try:
+                    self.constant_weights.append(float(raw_weight))
+                except ValueError:
+                    self.constant_weights.append(1.0)
+
+        self.alias_table = None
+
+        if self.random_actions and (None in self.constant_weights) is False:
+            weighted = [(action['action'], weight) for action, weight in zip(self.random_actions, self.constant_weights) if weight > 0.0]
+
+            if len(weighted) > 1:
+                self.alias_table = AliasTable([choice for choice, weight in weighted], [weight for choice, weight in weighted])
+
     def node_type(self):
         return 'random-branch'
 
@@ -40,6 +64,8 @@ class RandomBranchNode(BaseNode):
         for action in self.random_actions:
             action['action'] = prefix + action['action']
 
+        self.index_weights()
+
     def node_definition(self):
         node_def = super().node_definition() # pylint: disable=missing-super-argument
 
@@ -57,26 +83,24 @@ class RandomBranchNode(BaseNode):
 
         weight_metadata = {}
 
-        for action in self.random_actions:
-            raw_weight = action['weight']
-
-            value_template = Template('%s' % raw_weight)
+        context = None
 
-            context_metadata = copy.deepcopy(dialog.metadata)
-
-            if extras is not None:
-                context_metadata.update(copy.deepcopy(extras))
+        for action, weight in zip(self.random_actions, self.constant_weights):
+            raw_weight = action['weight']
 
-            context = Context(context_metadata)
+            if weight is None:
+                if context is None: # One layered context (extras over metadata) per evaluation.
+                    context = Context(dialog.metadata)
 
-            rendered = value_template.render(context)
+                    if extras is not None:
+                        context.push(extras)
 
-            weight = 1.0
+                rendered = fetch_template('%s' % raw_weight).render(context)
 
-            try:
-                weight = float(rendered)
-            except: # pylint: disable=bare-except
-                weight = 1.0
+                try:
+                    weight = float(rendered)
+                except: # pylint: disable=bare-except
+                    weight = 1.0
 
             if weight > 0.0:
                 choices.append(action['action'])
@@ -89,6 +113,8 @@ class RandomBranchNode(BaseNode):
 
         chosen = None
 
+        choices_removed = False
+
         if self.without_replacement and extras is not None:
             key = '__%s_prior_choices' % self.node_id
 
@@ -110,15 +136,20 @@ class RandomBranchNode(BaseNode):
 
                     del weight_metadata[prior_choice]
 
+                    choices_removed = True
+
                 except ValueError:
                     pass # Not in list
 
+        sampler = random_sampler()
+
         if len(choices) > 1:
-            try:
-                normalized_weights = numpy.array(weights) / numpy.sum(weights)
-                chosen = numpy.random.choice(choices, p=normalized_weights)
-            except ValueError:
-                chosen = numpy.random.choice(choices)
+            alias_table = None
+
+            if choices_removed is False:
+                alias_table = self.alias_table
+
+            chosen = sampler.weighted_choice(choices, weights, dialog.random_generator(), alias_table=alias_table)
         elif len(choices) == 1:
             chosen = choices[0]
         else:
@@ -127,7 +158,7 @@ class RandomBranchNode(BaseNode):
             for action in self.random_actions:
                 choices.append(action['action'])
 
-            chosen = numpy.random.choice(choices)
+            chosen = sampler.choice(choices, dialog.random_generator())
 
         transition = DialogTransition(new_state_id=chosen)
 
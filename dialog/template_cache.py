@@ -0,0 +1,57 @@
+# pylint: disable=line-too-long
+
+from six import string_types
+
+from django.conf import settings
+from django.template import Template
+from django.template.exceptions import TemplateSyntaxError
+
+from .lru_cache import LRUCache
+
+TEMPLATE_MARKERS = ('{{', '{%', '{#',)
+
+TEMPLATE_CACHE = LRUCache('DJANGO_DIALOG_ENGINE_TEMPLATE_CACHE_SIZE', 1024)
+
+_LOAD_PREFIXES = {}
+
+def is_template(source):
+    for marker in TEMPLATE_MARKERS:
+        if marker in source:
+            return True
+
+    return False
+
+def fetch_template(source):
+    return TEMPLATE_CACHE.fetch(source, lambda: Template(source))
+
+def template_loads_prefix():
+    template_loads = tuple(getattr(settings, 'DJANGO_DIALOG_ENGINE_TEMPLATE_LOADS', ()))
+
+    prefix = _LOAD_PREFIXES.get(template_loads, None)
+
+    if prefix is None:
+        prefix = ''
+
+        for template_load in template_loads:
+            prefix += '{%% load %s %%}' % template_load
+
+        _LOAD_PREFIXES[template_loads] = prefix
+
+    return prefix
+
+def fetch_dialog_template(source):
+    return fetch_template('%s{%% autoescape off %%}%s{%% endautoescape %%}' % (template_loads_prefix(), source))
+
+def precompile_templates(obj):
+    if isinstance(obj, string_types):
+        if is_template(obj):
+            try:
+                fetch_dialog_template(obj)
+            except TemplateSyntaxError:
+                pass # Reported when the template is rendered.
+    elif isinstance(obj, list):
+        for item in obj:
+            precompile_templates(item)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            precompile_templates(value)
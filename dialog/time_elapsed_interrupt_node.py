@@ -1,5 +1,7 @@
 # pylint: disable=line-too-long, super-with-arguments
 
+import datetime
+
 from django.utils import timezone
 
 from .base_node import BaseNode, DialogTransition
@@ -26,6 +28,8 @@ class TimeElapsedInterruptNode(BaseNode):
         if self.minutes_elapsed is None:
             self.minutes_elapsed = 0
 
+        self.elapsed_seconds = (self.hours_elapsed * 60 * 60) + (self.minutes_elapsed * 60)
+
     def node_type(self):
         return 'time-elapsed-interrupt'
 
@@ -37,21 +41,23 @@ class TimeElapsedInterruptNode(BaseNode):
 
         return node_def
 
-    def should_fire(self, last_transition=None, ignore_transitions=False):
-        if last_transition is not None and self.hours_elapsed is not None and self.minutes_elapsed is not None:
-            elapsed_seconds = (self.hours_elapsed * 60 * 60) + (self.minutes_elapsed * 60)
+    def fire_time(self, started):
+        if started is None:
+            return None
 
+        return started + datetime.timedelta(seconds=self.elapsed_seconds)
+
+    def should_fire(self, last_transition=None, ignore_transitions=False):
+        if last_transition is not None:
             dialog = last_transition.dialog
 
             now = timezone.now()
 
-            if (now - dialog.started).total_seconds() >= elapsed_seconds:
+            if (now - dialog.started).total_seconds() >= self.elapsed_seconds:
                 if ignore_transitions:
                     return True
 
-                existing_transitions = dialog.transitions.filter(state_id=self.node_id)
-
-                if existing_transitions.count() > 0:
+                if dialog.has_visited(self.node_id):
                     return False # Already fired / entered state
 
                 return True
@@ -0,0 +1,141 @@
+# pylint: disable=useless-object-inheritance, line-too-long, no-member
+
+import random
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+RANDOM_STATE_KEY = 'django_dialog_engine_random_state'
+
+class AliasTable(object): # pylint: disable=too-few-public-methods
+    def __init__(self, choices, weights):
+        self.choices = list(choices)
+
+        count = len(self.choices)
+
+        total = float(sum(weights))
+
+        scaled = [(weight * count) / total for weight in weights]
+
+        self.probabilities = [1.0] * count
+        self.aliases = list(range(0, count))
+
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def sample(self, rng=None):
+        if rng is None:
+            rng = random
+
+        position = rng.random() * len(self.choices)
+
+        index = int(position)
+
+        if (position - index) < self.probabilities[index]:
+            return self.choices[index]
+
+        return self.choices[self.aliases[index]]
+
+class PythonSampler(object):
+    def weighted_choice(self, choices, weights, rng, alias_table=None): # pylint: disable=no-self-use
+        if alias_table is not None:
+            return alias_table.sample(rng)
+
+        target = rng.random() * sum(weights)
+
+        cumulative = 0.0
+
+        for choice, weight in zip(choices, weights):
+            cumulative += weight
+
+            if target < cumulative:
+                return choice
+
+        return choices[-1]
+
+    def choice(self, choices, rng): # pylint: disable=no-self-use
+        return choices[int(rng.random() * len(choices))]
+
+class NumpySampler(object):
+    @staticmethod
+    def numpy_generator(rng):
+        import numpy # pylint: disable=import-outside-toplevel
+
+        return numpy.random.RandomState(rng.getrandbits(32)) # Seeded from the dialog's draw, so choices replay.
+
+    def weighted_choice(self, choices, weights, rng, alias_table=None): # pylint: disable=unused-argument
+        import numpy # pylint: disable=import-outside-toplevel
+
+        generator = self.numpy_generator(rng)
+
+        try:
+            normalized_weights = numpy.array(weights, dtype=float) / numpy.sum(weights)
+
+            return choices[generator.choice(len(choices), p=normalized_weights)]
+        except ValueError:
+            return choices[generator.choice(len(choices))]
+
+    def choice(self, choices, rng):
+        return choices[self.numpy_generator(rng).choice(len(choices))]
+
+SAMPLERS = {
+    'python': PythonSampler,
+    'numpy': NumpySampler,
+}
+
+_SAMPLER_INSTANCES = {}
+
+def random_sampler():
+    backend = getattr(settings, 'DJANGO_DIALOG_ENGINE_RANDOM_BACKEND', 'python')
+
+    sampler = _SAMPLER_INSTANCES.get(backend, None)
+
+    if sampler is None:
+        sampler_class = SAMPLERS.get(backend, None)
+
+        if sampler_class is None:
+            sampler_class = import_string(backend)
+
+        sampler = sampler_class()
+
+        _SAMPLER_INSTANCES[backend] = sampler
+
+    return sampler
+
+def seeded_generator(seed, draw):
+    # Replayable per-dialog draws for random branching - not used for anything security-sensitive.
+
+    return random.Random('%s:%s' % (seed, draw)) # nosec B311
+
+def new_random_seed():
+    return random.SystemRandom().randint(0, (2 ** 63) - 1)
+
+def next_random_generator(metadata):
+    state = metadata.get(RANDOM_STATE_KEY, None)
+
+    if state is None:
+        state = {
+            'seed': new_random_seed(),
+            'draws': 0
+        }
+
+    metadata[RANDOM_STATE_KEY] = {
+        'seed': state['seed'],
+        'draws': state['draws'] + 1
+    }
+
+    return seeded_generator(state['seed'], state['draws'])
@@ -1,9 +1,40 @@
 # pylint: disable=line-too-long
 
+import re
+
+def invalid_pattern(pattern):
+    try:
+        re.compile(pattern)
+    except (re.error, TypeError) as ex:
+        return ex
+
+    return None
+
+def node_patterns(node):
+    if node['type'] in ('branch-prompt', 'http-response',):
+        if node['type'] == 'http-response' and node.get('pattern_matcher', 're') != 're':
+            return []
+
+        return [action.get('pattern', None) for action in node.get('actions', [])]
+
+    if node['type'] == 'prompt':
+        return node.get('valid_patterns', [])
+
+    if node['type'] == 'interrupt':
+        return node.get('match_patterns', [])
+
+    return []
+
 def identify_script_issues(script): # pylint: disable=too-many-branches
     issues = []
 
     for node in script.definition: # pylint: disable=too-many-nested-blocks
+        for pattern in node_patterns(node):
+            pattern_error = invalid_pattern(pattern)
+
+            if pattern_error is not None:
+                issues.append(('error', 'Node "%s" (%s) contains an invalid pattern that will never match: %s (%s).' % (node.get('name', None), node.get('id', None), pattern, pattern_error,),))
+
         if node['type'] == 'random-branch':
             actions = node.get('actions', [])
 
@@ -8,7 +8,8 @@ from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.core import serializers
 
-from .models import DialogScript, DialogScriptVersion, Dialog, DialogStateTransition
+from .middleware import acting_user
+from .models import DialogScript, DialogScriptVersion, Dialog, DialogStateTransition, DialogVariable, get_requested_user
 
 def import_objects(file_type, import_file):
     if file_type == 'django_dialog_engine.dialogscript':
@@ -35,6 +36,12 @@ def import_dialogs(import_file): # pylint: disable=too-many-locals,too-many-bran
                 for field_key in dialog_json.get('fields', {}).keys():
                     field_value = dialog_json.get('fields', {}).get(field_key, None)
 
+                    if field_key in Dialog.STATE_FIELDS:
+                        continue # Rebuilt as the transitions below are imported.
+
+                    if field_key == 'snapshot':
+                        continue # Local shared row - re-interned from dialog_snapshot on save.
+
                     if field_key in ('started', 'finished'):
                         if field_value is not None:
                             field_value = iso8601.parse_date(field_value)
@@ -64,6 +71,9 @@ def import_dialogs(import_file): # pylint: disable=too-many-locals,too-many-bran
 
                         transitions_imported += 1
 
+                for key, value in dialog_json.get('variables', {}).items(): # Set when DJANGO_DIALOG_ENGINE_VARIABLE_STORAGE = 'table'.
+                    DialogVariable.objects.create(dialog=dialog_obj, key=key, value=value)
+
         if dialogs_imported > 1:
             user_messages.append(('%s dialogs imported.' % dialogs_imported, messages.SUCCESS))
         elif dialogs_imported == 1:
@@ -83,7 +93,7 @@ def import_dialogs(import_file): # pylint: disable=too-many-locals,too-many-bran
 def import_dialog_scripts(import_file): # pylint: disable=too-many-locals,too-many-branches,too-many-statements
     user_messages = []
 
-    with import_file.open() as file_stream:
+    with acting_user(get_requested_user()), import_file.open() as file_stream: # Resolve the importing user once, not per saved script.
         scripts_json = json.load(file_stream)
 
         scripts_updated = 0
@@ -114,9 +124,14 @@ def import_dialog_scripts(import_file): # pylint: disable=too-many-locals,too-ma
 
                         setattr(script_obj, field_key, field_value)
 
+                    latest_version = script_obj.versions.all().order_by('-pk').first()
+
                     script_obj.save()
 
-                    script_obj.versions.all().order_by('-pk').first().delete()
+                    saved_version = script_obj.versions.all().order_by('-pk').first()
+
+                    if saved_version is not None and saved_version != latest_version: # Unchanged definitions add no version.
+                        saved_version.delete()
 
                     DialogScriptVersion.objects.filter(dialog_script=None).delete()
 
@@ -134,6 +149,9 @@ def import_dialog_scripts(import_file): # pylint: disable=too-many-locals,too-ma
                             for field_key in version.get('fields', {}).keys():
                                 field_value = version.get('fields', {}).get(field_key, None)
 
+                                if field_key in ('keyframe', 'delta'):
+                                    continue # Imported versions store their full definition.
+
                                 if field_key in ('created', 'updated'):
                                     if field_value is not None:
                                         field_value = iso8601.parse_date(field_value)
@@ -183,6 +201,9 @@ def export_dialog_scripts(queryset):
             del version_json['pk']
             del version_json['fields']['dialog_script']
 
+            version_json['fields'].pop('keyframe', None) # Definition is exported in full.
+            version_json['fields'].pop('delta', None)
+
             creator = get_user_model().objects.filter(pk=version_json['fields']['creator']).first()
 
             if creator is None:
@@ -206,6 +227,11 @@ def export_dialogs(queryset):
 
         del dialog_json['pk']
 
+        for field_key in Dialog.STATE_FIELDS:
+            dialog_json['fields'].pop(field_key, None)
+
+        dialog_json['fields'].pop('snapshot', None) # Definition is exported in full as dialog_snapshot.
+
         if dialog.script is not None:
             dialog_json['fields']['script'] = dialog.script.identifier
 
@@ -219,6 +245,8 @@ def export_dialogs(queryset):
 
             dialog_json['transitions'].append(transition_json)
 
+        dialog_json['variables'] = dict(dialog.dialog_variables.values_list('key', 'value'))
+
         to_export.append(dialog_json)
 
     return to_export
@@ -0,0 +1,225 @@
+# pylint: disable=line-too-long, protected-access
+
+import base64
+import json
+import zlib
+
+from django.conf import settings
+from django.db.models.query_utils import DeferredAttribute
+
+from .dialog import apply_definition_delta, definition_hash
+
+try:
+    from django.db.models import JSONField
+except ImportError:
+    from django.contrib.postgres.fields import JSONField
+
+JSON_CODECS = {
+    'zlib': (zlib.compress, zlib.decompress,),
+}
+
+try:
+    import lzma
+
+    JSON_CODECS['lzma'] = (lzma.compress, lzma.decompress,)
+except ImportError:
+    pass
+
+COMPRESSED_KEY = '__django_dialog_engine_compressed__'
+
+def json_compression():
+    codec = getattr(settings, 'DJANGO_DIALOG_ENGINE_JSON_COMPRESSION', None)
+
+    if codec is not None and (codec in JSON_CODECS) is False:
+        raise ValueError('Unknown DJANGO_DIALOG_ENGINE_JSON_COMPRESSION codec: %s' % codec)
+
+    return codec
+
+def compress_json(value, codec):
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    if len(encoded) < getattr(settings, 'DJANGO_DIALOG_ENGINE_JSON_COMPRESSION_MIN_SIZE', 1024):
+        return value
+
+    return {
+        COMPRESSED_KEY: codec,
+        'data': base64.b64encode(JSON_CODECS[codec][0](encoded)).decode('ascii'),
+    }
+
+def decompress_json(value):
+    if isinstance(value, dict) and COMPRESSED_KEY in value:
+        decompress = JSON_CODECS[value[COMPRESSED_KEY]][1]
+
+        return json.loads(decompress(base64.b64decode(value['data'])).decode('utf-8'))
+
+    return value
+
+# Stores large values compressed when DJANGO_DIALOG_ENGINE_JSON_COMPRESSION is set ("zlib" or "lzma").
+# Compressed values live in a small JSON envelope, so the column type is unchanged and plain rows stay
+# readable (compress_dialog_json rewrites existing rows). Compressed rows cannot be searched or queried by key.
+
+class CompressedJSONField(JSONField):
+    def get_db_prep_value(self, value, connection, prepared=False):
+        # Compressed before JSONField serializes - Django < 4.2 returns a JSON string from get_prep_value.
+
+        codec = json_compression()
+
+        if prepared is False and codec is not None and value is not None and hasattr(value, 'resolve_expression') is False:
+            value = compress_json(value, codec)
+
+        return super(CompressedJSONField, self).get_db_prep_value(value, connection, prepared) # pylint: disable=super-with-arguments
+
+    def from_db_value(self, value, expression, connection):
+        return decompress_json(super(CompressedJSONField, self).from_db_value(value, expression, connection)) # pylint: disable=super-with-arguments
+
+class SnapshotDescriptor(DeferredAttribute):
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+
+        value = super(SnapshotDescriptor, self).__get__(instance, cls) # pylint: disable=super-with-arguments
+
+        if value is None:
+            snapshot = getattr(instance, self.field.snapshot_field)
+
+            if snapshot is not None:
+                value = snapshot.definition
+
+                instance.__dict__[self.field.attname] = value
+                instance.__dict__[self.field.fingerprint_attname] = (value, snapshot.content_hash,)
+
+        return value
+
+    def __set__(self, instance, value): # Data descriptor, so a loaded empty column does not shadow __get__.
+        instance.__dict__[self.field.attname] = value
+
+# Interned into a shared, content-addressed row (see DialogSnapshotManager.intern) on save, leaving the local
+# column empty - reads resolve through snapshot_field. Legacy rows keep their local copy until saved again or
+# deduplicated by dedup_dialog_snapshots.
+
+class SnapshotField(CompressedJSONField):
+    descriptor_class = SnapshotDescriptor
+
+    def __init__(self, *args, **kwargs):
+        self.snapshot_field = kwargs.pop('snapshot_field', 'snapshot')
+
+        super(SnapshotField, self).__init__(*args, **kwargs) # pylint: disable=super-with-arguments
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(SnapshotField, self).deconstruct() # pylint: disable=super-with-arguments
+
+        if self.snapshot_field != 'snapshot':
+            kwargs['snapshot_field'] = self.snapshot_field
+
+        return name, path, args, kwargs
+
+    @property
+    def fingerprint_attname(self):
+        return '_%s_fingerprint' % self.attname
+
+    def snapshot_id(self, model_instance):
+        return getattr(model_instance, model_instance._meta.get_field(self.snapshot_field).attname)
+
+    def loaded_hash(self, model_instance):
+        # Content hash recorded when the current value was loaded or interned - None once it has been reassigned.
+
+        fingerprint = model_instance.__dict__.get(self.fingerprint_attname, None)
+
+        if fingerprint is not None and fingerprint[0] is model_instance.__dict__.get(self.attname, None):
+            return fingerprint[1]
+
+        return None
+
+    def content_hash(self, model_instance):
+        content_hash = self.loaded_hash(model_instance)
+
+        if content_hash is None:
+            value = getattr(model_instance, self.attname)
+            content_hash = definition_hash(value)
+
+            model_instance.__dict__[self.fingerprint_attname] = (value, content_hash,)
+
+        return content_hash
+
+    def is_interned(self, model_instance):
+        # Only notices reassignment - in-place edits to a loaded definition are picked up by pre_save.
+
+        if self.snapshot_id(model_instance) is None:
+            return False
+
+        if model_instance.__dict__.get(self.attname, None) is None:
+            return True # Not loaded yet - the shared row is authoritative.
+
+        return self.loaded_hash(model_instance) is not None
+
+    def pre_save(self, model_instance, add):
+        if self.snapshot_id(model_instance) is not None and model_instance.__dict__.get(self.attname, None) is None:
+            return None # Not loaded - the shared row is authoritative.
+
+        value = getattr(model_instance, self.attname)
+
+        if value is None:
+            return None
+
+        loaded_hash = self.loaded_hash(model_instance)
+
+        if loaded_hash is not None and self.snapshot_id(model_instance) is not None and definition_hash(value) == loaded_hash:
+            return None # Unchanged, including in place.
+
+        snapshot_model = model_instance._meta.get_field(self.snapshot_field).related_model
+
+        snapshot = snapshot_model.objects.intern(value)
+
+        setattr(model_instance, self.snapshot_field, snapshot)
+
+        model_instance.__dict__[self.fingerprint_attname] = (value, snapshot.content_hash,)
+
+        return None
+
+class DeltaDescriptor(DeferredAttribute):
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+
+        value = super(DeltaDescriptor, self).__get__(instance, cls) # pylint: disable=super-with-arguments
+
+        if value is None and getattr(instance, self.field.delta_field) is not None:
+            if (self.field.resolved_attname in instance.__dict__) is False:
+                base = getattr(instance, self.field.base_field)
+
+                instance.__dict__[self.field.resolved_attname] = apply_definition_delta(getattr(base, self.field.attname), getattr(instance, self.field.delta_field))
+
+            value = instance.__dict__[self.field.resolved_attname]
+
+        return value
+
+    def __set__(self, instance, value): # Rebuilt values are cached separately, so saving never writes them back.
+        instance.__dict__[self.field.attname] = value
+        instance.__dict__.pop(self.field.resolved_attname, None)
+
+# Stores either a full definition (a keyframe) or nothing, in which case reads rebuild the value from
+# delta_field applied to base_field's definition (see definition_delta).
+
+class DeltaDefinitionField(CompressedJSONField):
+    descriptor_class = DeltaDescriptor
+
+    def __init__(self, *args, **kwargs):
+        self.delta_field = kwargs.pop('delta_field', 'delta')
+        self.base_field = kwargs.pop('base_field', 'keyframe')
+
+        super(DeltaDefinitionField, self).__init__(*args, **kwargs) # pylint: disable=super-with-arguments
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(DeltaDefinitionField, self).deconstruct() # pylint: disable=super-with-arguments
+
+        if self.delta_field != 'delta':
+            kwargs['delta_field'] = self.delta_field
+
+        if self.base_field != 'keyframe':
+            kwargs['base_field'] = self.base_field
+
+        return name, path, args, kwargs
+
+    @property
+    def resolved_attname(self):
+        return '_%s_resolved' % self.attname
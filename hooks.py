@@ -0,0 +1,61 @@
+# pylint: disable=line-too-long
+
+import importlib
+import logging
+import threading
+
+from django.conf import settings
+
+HOOK_NAMES = (
+    'initialize_dialog',
+    'finished_dialog',
+    'dialog_updated',
+    'update_custom_node_environment',
+    'identify_script_issues',
+    'process',
+    'create_dialog_from_path',
+)
+
+_HOOKS = None
+_HOOKS_LOCK = threading.Lock()
+
+def load_hooks(reload=False):
+    global _HOOKS # pylint: disable=global-statement
+
+    with _HOOKS_LOCK:
+        if _HOOKS is not None and reload is False:
+            return _HOOKS
+
+        hooks = {}
+
+        for hook_name in HOOK_NAMES:
+            hooks[hook_name] = []
+
+        for app in settings.INSTALLED_APPS:
+            try:
+                dialog_module = importlib.import_module(app + '.dialog_api')
+            except ImportError as ex:
+                missing_name = getattr(ex, 'name', None)
+
+                if missing_name is not None and (app + '.dialog_api').startswith(missing_name) is False:
+                    logging.getLogger(__name__).warning('Unable to import %s.dialog_api: %s', app, ex)
+
+                continue
+
+            for hook_name in HOOK_NAMES:
+                hook = getattr(dialog_module, hook_name, None)
+
+                if callable(hook):
+                    hooks[hook_name].append(hook)
+
+        _HOOKS = hooks
+
+    return _HOOKS
+
+def hooks_for(hook_name):
+    hooks = _HOOKS
+
+    if hooks is None:
+        hooks = load_hooks()
+
+    return hooks.get(hook_name, [])
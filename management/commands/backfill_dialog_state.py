@@ -0,0 +1,80 @@
+# pylint: disable=no-member, line-too-long
+# -*- coding: utf-8 -*-
+
+import six
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Coalesce, Left
+
+from ...models import Dialog, DialogStateTransition
+
+def pk_batches(queryset, batch_size):
+    pending = queryset.order_by('pk').values_list('pk', flat=True)
+
+    last_pk = 0
+
+    while True:
+        batch = list(pending.filter(pk__gt=last_pk)[:batch_size])
+
+        if len(batch) == 0: # pylint: disable=len-as-condition
+            return
+
+        yield batch
+
+        last_pk = batch[-1]
+
+class Command(BaseCommand):
+    help = 'Populates the denormalized state columns on dialogs created before they existed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        latest = DialogStateTransition.objects.filter(dialog=OuterRef('pk')).order_by('-when')
+
+        updated = 0
+
+        for batch in pk_batches(Dialog.objects.filter(last_transition=None), options['batch_size']):
+            with transaction.atomic():
+                updated += Dialog.objects.filter(pk__in=batch).update(current_state=Subquery(latest.values('state_id')[:1]), last_transition_at=Subquery(latest.values('when')[:1]), last_transition=Subquery(latest.values('pk')[:1]))
+
+        six.print_('Dialogs inspected: %d' % updated)
+
+        seeded = 0
+
+        for batch in pk_batches(Dialog.objects.filter(state_visits__isnull=True), options['batch_size']):
+            state_visits = {}
+
+            for dialog_id, state_id, count in DialogStateTransition.objects.filter(dialog_id__in=batch).order_by().values_list('dialog_id', 'state_id').annotate(count=Count('pk')):
+                state_visits.setdefault(dialog_id, {})[state_id] = count
+
+            with transaction.atomic():
+                for dialog_id in batch:
+                    seeded += Dialog.objects.filter(pk=dialog_id, state_visits__isnull=True).update(state_visits=state_visits.get(dialog_id, {}))
+
+        six.print_('Dialog visit counts seeded: %d' % seeded)
+
+        scheduled = 0
+
+        for dialog in Dialog.objects.filter(finished=None, next_wakeup_at=None).exclude(Q(dialog_snapshot__isnull=True) & Q(snapshot=None)).defer('dialog_snapshot').iterator(chunk_size=options['batch_size']):
+            dialog_machine = dialog.dialog_machine()
+
+            if dialog.current_state is not None:
+                dialog_machine.advance_to(dialog.current_state)
+
+            dialog.update_next_wakeup(dialog_machine, include_due=True)
+
+            if dialog.next_wakeup_at is not None:
+                scheduled += 1
+
+        six.print_('Dialog wakeups scheduled: %d' % scheduled)
+
+        reasons = 0
+
+        for batch in pk_batches(DialogStateTransition.objects.filter(reason__isnull=True), options['batch_size']):
+            reasons += DialogStateTransition.objects.filter(pk__in=batch).update(reason=Left(Coalesce(KeyTextTransform('reason', 'metadata'), Value('')), 128))
+
+        six.print_('Transition reasons populated: %d' % reasons)
@@ -0,0 +1,253 @@
+# pylint: disable=no-member, line-too-long
+# -*- coding: utf-8 -*-
+
+import copy
+import glob
+import io
+import json
+import os
+import timeit
+
+import six
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from ...dialog import DialogMachine, InterruptNode, definition_hash
+from ...fields import JSON_CODECS, compress_json, decompress_json
+from ...models import DialogScript, DialogScriptVersion
+
+def interrupt_script(node_count, interrupt_count):
+    definition = [{
+        'id': 'begin',
+        'type': 'begin',
+        'next_id': 'echo-0'
+    }]
+
+    for index in range(0, node_count - interrupt_count - 2):
+        definition.append({
+            'id': 'echo-%d' % index,
+            'type': 'echo',
+            'message': 'Message %d' % index,
+            'next_id': 'echo-%d' % (index + 1)
+        })
+
+    definition[-1]['next_id'] = 'end'
+
+    for index in range(0, interrupt_count):
+        definition.append({
+            'id': 'interrupt-%d' % index,
+            'type': 'interrupt',
+            'match_patterns': ['^keyword%d$' % index, 'help me %d' % index],
+            'next_id': 'end'
+        })
+
+    definition.append({
+        'id': 'end',
+        'type': 'end'
+    })
+
+    return definition
+
+def benchmark_interrupts(command, options):
+    definition = interrupt_script(options['nodes'], options['interrupts'])
+
+    machine = DialogMachine(definition)
+
+    responses = [
+        'this message matches none of the interrupt patterns',
+        'keyword%d' % (options['interrupts'] - 1),
+        'please help me %d' % (options['interrupts'] // 2),
+    ]
+
+    def legacy_scan():
+        for response in responses:
+            for node in machine.all_nodes.values():
+                if isinstance(node, InterruptNode) and node.matches(response) is not None:
+                    break
+
+    def indexed_scan():
+        for response in responses:
+            machine.matching_interrupt(response)
+
+    for response in responses:
+        legacy_match = None
+
+        for node in machine.all_nodes.values():
+            if legacy_match is None and isinstance(node, InterruptNode):
+                legacy_match = node.matches(response)
+
+        indexed_match = machine.matching_interrupt(response)
+
+        if indexed_match is not None:
+            indexed_match = indexed_match[2]
+
+        if legacy_match != indexed_match:
+            raise ValueError('Interrupt index disagrees with node scan for "%s": %s != %s' % (response, indexed_match, legacy_match))
+
+    command.report('Interrupt detection (%d nodes, %d interrupts, %d responses)' % (len(machine.all_nodes), options['interrupts'], len(responses)), {
+        'node scan': legacy_scan,
+        'interrupt index': indexed_scan,
+    }, options['iterations'])
+
+def conditions_script(condition_count):
+    actions = []
+
+    for index in range(0, condition_count):
+        actions.append({
+            'condition': 'score > %d and name.startswith("user") and len(answers) == %d' % (index * 10, index),
+            'action': 'end'
+        })
+
+    return [{
+        'id': 'begin',
+        'type': 'begin',
+        'next_id': 'conditions'
+    }, {
+        'id': 'conditions',
+        'type': 'branch-conditions',
+        'actions': actions,
+        'no_match': 'end',
+        'error': 'end'
+    }, {
+        'id': 'end',
+        'type': 'end'
+    }]
+
+def benchmark_conditions(command, options):
+    machine = DialogMachine(conditions_script(options['conditions']))
+    machine.advance_to('conditions')
+
+    node = machine.current_node
+
+    extras = {
+        'score': 5,
+        'name': 'user-1234',
+        'answers': ['yes', 'no', 'maybe'],
+    }
+
+    def legacy_eval():
+        for conditional_action in node.conditional_actions:
+            if eval(conditional_action['condition'], {}, extras): # nosec # pylint: disable=eval-used
+                break
+
+    def compiled_eval():
+        node.evaluate(machine, extras=extras)
+
+    command.report('Branch conditions (%d conditions, no match)' % options['conditions'], {
+        'eval(source)': legacy_eval,
+        'compiled conditions': compiled_eval,
+    }, options['iterations'])
+
+def scaled_script(definition, scale):
+    scaled = []
+
+    for index in range(0, scale):
+        for node in definition:
+            node = copy.deepcopy(node)
+            node['id'] = '%s-%d' % (node['id'], index)
+
+            scaled.append(node)
+
+    return scaled
+
+def benchmark_storage(command, options):
+    scripts_path = os.path.join(os.path.dirname(__file__), '..', '..', 'dialog_scripts', '*.json')
+
+    definitions = []
+
+    for script_path in sorted(glob.glob(scripts_path)):
+        with io.open(script_path, encoding='utf8') as script_file:
+            definitions.append(scaled_script(json.load(script_file), options['scale']))
+
+    stored = {
+        'json': [json.dumps(definition) for definition in definitions],
+    }
+
+    for codec in sorted(JSON_CODECS.keys()):
+        stored[codec] = [json.dumps(compress_json(definition, codec)) for definition in definitions]
+
+    six.print_('Stored size (%d scripts x%d)' % (len(definitions), options['scale']))
+
+    for name, rows in stored.items():
+        six.print_('  %-24s %10d bytes' % (name, sum(len(row) for row in rows)))
+
+    for name, rows in stored.items():
+        for row, definition in zip(rows, definitions):
+            if decompress_json(json.loads(row)) != definition:
+                raise ValueError('%s storage does not round-trip.' % name)
+
+    def loader(rows):
+        def load():
+            for row in rows:
+                decompress_json(json.loads(row))
+
+        return load
+
+    command.report('Row decode (%d scripts x%d)' % (len(definitions), options['scale']), dict((name, loader(rows)) for name, rows in stored.items()), options['iterations'])
+
+def benchmark_script_save(command, options):
+    definition = conditions_script(options['conditions'])
+
+    with transaction.atomic(): # Rolled back below - nothing is left in the database.
+        script = DialogScript.objects.create(name='Benchmark Script', identifier='django-dialog-engine-benchmark', definition=definition)
+
+        history = []
+
+        for index in range(0, options['versions']):
+            revision = copy.deepcopy(definition)
+            revision[0]['comment'] = 'Revision %d' % index
+
+            history.append(DialogScriptVersion(name=script.name, identifier=script.identifier, definition=revision, content_hash=definition_hash(revision), updated=timezone.now()))
+
+        DialogScriptVersion.objects.bulk_create(history, batch_size=1000) # Orphaned history for the same identifier - the worst case for attachment.
+
+        content_hash = definition_hash(definition)
+
+        def equality_lookup():
+            list(DialogScriptVersion.objects.filter(dialog_script=None, identifier=script.identifier, definition=definition))
+
+        def hash_lookup():
+            list(DialogScriptVersion.objects.filter(dialog_script=None, identifier=script.identifier, content_hash=content_hash))
+
+        def save_script():
+            script.save()
+
+        command.report('Script save (%d historical versions)' % options['versions'], {
+            'definition equality': equality_lookup,
+            'content hash lookup': hash_lookup,
+            'DialogScript.save()': save_script,
+        }, options['iterations'])
+
+        transaction.set_rollback(True)
+
+BENCHMARKS = {
+    'conditions': benchmark_conditions,
+    'interrupts': benchmark_interrupts,
+    'script_save': benchmark_script_save,
+    'storage': benchmark_storage,
+}
+
+class Command(BaseCommand):
+    help = 'Runs micro-benchmarks against the dialog engine hot paths.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('benchmark', type=str, choices=sorted(BENCHMARKS.keys()))
+        parser.add_argument('--iterations', type=int, default=1000)
+        parser.add_argument('--nodes', type=int, default=1000)
+        parser.add_argument('--interrupts', type=int, default=25)
+        parser.add_argument('--conditions', type=int, default=50)
+        parser.add_argument('--scale', type=int, default=100)
+        parser.add_argument('--versions', type=int, default=100000)
+
+    def report(self, title, candidates, iterations): # pylint: disable=no-self-use
+        six.print_(title)
+
+        for name, candidate in candidates.items():
+            elapsed = timeit.timeit(candidate, number=iterations)
+
+            six.print_('  %-24s %10.2f us / iteration' % (name, (elapsed / iterations) * 1000000))
+
+    def handle(self, *args, **options):
+        BENCHMARKS[options['benchmark']](self, options)
@@ -0,0 +1,41 @@
+# pylint: disable=no-member, line-too-long
+# -*- coding: utf-8 -*-
+
+import six
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...models import DialogScript, DialogScriptVersion
+
+class Command(BaseCommand):
+    help = 'Re-encodes full dialog script versions as deltas against periodic keyframes (see DJANGO_DIALOG_ENGINE_VERSION_KEYFRAME_INTERVAL).'
+
+    def handle(self, *args, **options):
+        encoded = 0
+
+        for script_id in DialogScript.objects.order_by('pk').values_list('pk', flat=True):
+            keyframe = None
+
+            with transaction.atomic():
+                for version in DialogScriptVersion.objects.filter(dialog_script_id=script_id).order_by('updated', 'pk'):
+                    if version.keyframe_id is not None:
+                        continue # Already a delta.
+
+                    if keyframe is None or version.deltas.exists():
+                        keyframe = version # Later versions are already encoded against this one.
+
+                        continue
+
+                    content_hash = version.version_hash()
+
+                    version.encode_definition(version.definition, keyframe)
+
+                    if version.keyframe_id is None:
+                        keyframe = version
+                    else:
+                        DialogScriptVersion.objects.filter(pk=version.pk).update(content_hash=content_hash, definition=None, delta=version.delta, keyframe=version.keyframe)
+
+                        encoded += 1
+
+        six.print_('Dialog script versions delta-encoded: %d' % encoded)
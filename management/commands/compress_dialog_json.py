@@ -0,0 +1,39 @@
+# pylint: disable=no-member, line-too-long
+# -*- coding: utf-8 -*-
+
+import six
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...fields import json_compression
+from ...models import Dialog, DialogScript, DialogScriptVersion, DialogSnapshot
+from .backfill_dialog_state import pk_batches
+
+COMPRESSED_FIELDS = (
+    (DialogScript, 'definition',),
+    (DialogScriptVersion, 'definition',),
+    (DialogSnapshot, 'definition',),
+    (Dialog, 'dialog_snapshot',),
+)
+
+class Command(BaseCommand):
+    help = 'Rewrites stored definitions using the current DJANGO_DIALOG_ENGINE_JSON_COMPRESSION setting (decompressing them when unset).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        six.print_('Compression: %s' % json_compression())
+
+        for model, field_name in COMPRESSED_FIELDS:
+            queryset = model.objects.exclude(**{'%s__isnull' % field_name: True})
+
+            rewritten = 0
+
+            for batch in pk_batches(queryset, options['batch_size']):
+                with transaction.atomic():
+                    for row_id, value in queryset.filter(pk__in=batch).values_list('pk', field_name):
+                        rewritten += model.objects.filter(pk=row_id).update(**{field_name: value}) # Bypasses save() - storage only, no new versions.
+
+            six.print_('%s.%s rows rewritten: %d' % (model.__name__, field_name, rewritten))
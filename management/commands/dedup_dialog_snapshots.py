@@ -0,0 +1,33 @@
+# pylint: disable=no-member, line-too-long
+# -*- coding: utf-8 -*-
+
+import six
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...models import Dialog, DialogSnapshot
+from .backfill_dialog_state import pk_batches
+
+class Command(BaseCommand):
+    help = 'Moves per-dialog script snapshots into shared, content-addressed DialogSnapshot rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100) # Legacy snapshots may be large - keep batches small.
+
+    def handle(self, *args, **options):
+        moved = 0
+
+        for batch in pk_batches(Dialog.objects.filter(dialog_snapshot__isnull=False), options['batch_size']):
+            with transaction.atomic():
+                dialogs = {}
+
+                for dialog_id, definition in Dialog.objects.filter(pk__in=batch, dialog_snapshot__isnull=False).select_for_update().values_list('pk', 'dialog_snapshot'):
+                    snapshot = DialogSnapshot.objects.intern(definition)
+
+                    dialogs.setdefault(snapshot.pk, []).append(dialog_id)
+
+                for snapshot_id, dialog_ids in dialogs.items():
+                    moved += Dialog.objects.filter(pk__in=dialog_ids).update(snapshot=snapshot_id, dialog_snapshot=None)
+
+        six.print_('Dialog snapshots deduplicated: %d (%d shared snapshots)' % (moved, DialogSnapshot.objects.count()))
@@ -0,0 +1,68 @@
+# pylint: disable=no-member, line-too-long
+# -*- coding: utf-8 -*-
+
+import logging
+
+import six
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...hooks import hooks_for
+from ...models import Dialog
+
+def wake_dialog(dialog):
+    for process_hook in hooks_for('process'):
+        try:
+            process_hook(dialog, None, extras={})
+
+            return
+        except ImportError:
+            pass
+        except AttributeError:
+            pass
+
+    actions = dialog.process(None)
+
+    if actions:
+        logging.getLogger(__name__).warning('No "process" hook installed to deliver %d actions from dialog %s.', len(actions), dialog.pk)
+
+class Command(BaseCommand):
+    help = 'Processes active dialogs with a pause, timeout or time-elapsed interrupt that has come due.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+
+        due = Dialog.objects.filter(finished=None, next_wakeup_at__lte=now).order_by('next_wakeup_at')
+
+        processed = 0
+
+        failed = [] # Left due for the next sweep to retry.
+
+        while True:
+            batch = list(due.exclude(pk__in=failed).values_list('pk', flat=True)[:options['batch_size']])
+
+            if len(batch) == 0: # pylint: disable=len-as-condition
+                break
+
+            woken = []
+
+            for dialog in Dialog.objects.filter(pk__in=batch):
+                try:
+                    wake_dialog(dialog)
+
+                    woken.append(dialog.pk)
+                except Exception: # pylint: disable=broad-except
+                    logging.getLogger(__name__).exception('Unable to process wakeup for dialog %s.', dialog.pk)
+
+                    failed.append(dialog.pk)
+
+                processed += 1
+
+            # Dialogs still due did not transition - wait for a response or the next transition instead of retrying.
+            Dialog.objects.filter(pk__in=woken, finished=None, next_wakeup_at__lte=now).update(next_wakeup_at=None)
+
+        six.print_('Dialogs processed: %d' % processed)
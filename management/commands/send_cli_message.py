@@ -1,7 +1,6 @@
 # pylint: disable=no-member, line-too-long
 # -*- coding: utf-8 -*-
 
-import importlib
 import io
 import json
 import logging
@@ -14,6 +13,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.utils.text import slugify
 
+from ...hooks import hooks_for
 from ...models import Dialog
 
 def process(dialog, message, extras=None, skip_extensions=False):
@@ -23,12 +23,10 @@ def process(dialog, message, extras=None, skip_extensions=False):
     processed = False
 
     if skip_extensions is False:
-        for app in settings.INSTALLED_APPS:
+        for process_hook in hooks_for('process'):
             if processed is False:
                 try:
-                    app_dialog_api = importlib.import_module(app + '.dialog_api')
-
-                    app_dialog_api.process(dialog, message, extras=extras)
+                    process_hook(dialog, message, extras=extras)
 
                     processed = True
                 except ImportError:
@@ -37,7 +35,7 @@ def process(dialog, message, extras=None, skip_extensions=False):
                     pass
 
     if processed is False:
-        actions = dialog.process(message, extras=extras)
+        actions = dialog.process(message, extras=extras, auto_advance=True)
 
         if actions is None:
             actions = []
@@ -46,6 +44,8 @@ def process(dialog, message, extras=None, skip_extensions=False):
             if action['type'] == 'echo':
                 six.print_(action['message'])
 
+    return processed
+
 
 class Command(BaseCommand):
     help = 'Creates a new dialog from a provided JSON definition and executes it via the command line interface'
@@ -77,17 +77,17 @@ class Command(BaseCommand):
 
         active_dialog = Dialog.objects.filter(key=key, finished=None).first()
 
-        if active_dialog is None:
+        if active_dialog is None: # pylint: disable=too-many-nested-blocks
             if options['skip_extensions'] is False:
-                for app in settings.INSTALLED_APPS:
+                for create_dialog_from_path in hooks_for('create_dialog_from_path'):
                     if active_dialog is None:
                         try:
-                            app_dialog_api = importlib.import_module(app + '.dialog_api')
+                            active_dialog = create_dialog_from_path(dialog_script_path, dialog_key=key)
 
-                            active_dialog = app_dialog_api.create_dialog_from_path(dialog_script_path, dialog_key=key)
-                            active_dialog.key = key
-                            active_dialog.started = timezone.now()
-                            active_dialog.save()
+                            if active_dialog is not None:
+                                active_dialog.key = key
+                                active_dialog.started = timezone.now()
+                                active_dialog.save()
                         except ImportError:
                             pass
                         except AttributeError:
@@ -99,7 +99,8 @@ class Command(BaseCommand):
 
                 active_dialog = Dialog.objects.create(key=key, dialog_snapshot=dialog_script, started=timezone.now())
 
-        process(active_dialog, options['message'], extras=extras, skip_extensions=options['skip_extensions'])
+        if process(active_dialog, options['message'], extras=extras, skip_extensions=options['skip_extensions']) is False:
+            return # Built-in processing auto-advances until the dialog waits.
 
         last_transition = active_dialog.transitions.order_by('-when').first()
 
@@ -107,7 +108,7 @@ class Command(BaseCommand):
 
         nudge_transition = active_dialog.transitions.order_by('-when').first()
 
-        while nudge_transition.pk != last_transition.pk:
+        while nudge_transition.pk != last_transition.pk: # Extension hooks may process a single step at a time.
             last_transition = nudge_transition
 
             process(active_dialog, None, extras=extras, skip_extensions=options['skip_extensions'])
@@ -0,0 +1,55 @@
+# pylint: disable=line-too-long, useless-object-inheritance
+
+import contextlib
+import threading
+
+UNKNOWN_USER = object()
+
+class ThreadLocalVariable(threading.local):
+    # Subset of contextvars.ContextVar for Python 3.6 - per thread rather than per async task.
+
+    def __init__(self, name, default=None): # pylint: disable=super-init-not-called
+        self.name = name
+        self.value = default
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        token = self.value
+
+        self.value = value
+
+        return token
+
+    def reset(self, token):
+        self.value = token
+
+try:
+    import contextvars
+
+    REQUESTED_USER = contextvars.ContextVar('django_dialog_engine_requested_user', default=UNKNOWN_USER)
+except ImportError:
+    REQUESTED_USER = ThreadLocalVariable('django_dialog_engine_requested_user', default=UNKNOWN_USER)
+
+def current_user():
+    return REQUESTED_USER.get()
+
+@contextlib.contextmanager
+def acting_user(user):
+    token = REQUESTED_USER.set(user)
+
+    try:
+        yield user
+    finally:
+        REQUESTED_USER.reset(token)
+
+class RequestedUserMiddleware(object): # pylint: disable=too-few-public-methods
+    # Add after django.contrib.auth.middleware.AuthenticationMiddleware - records request.user as the creator of new DialogScriptVersion rows.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with acting_user(getattr(request, 'user', None)):
+            return self.get_response(request)
@@ -0,0 +1,30 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0020_alter_dialogscript_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dialog',
+            name='current_state',
+            field=models.CharField(blank=True, db_index=True, max_length=128, null=True),
+        ),
+        migrations.AddField(
+            model_name='dialog',
+            name='last_transition_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dialog',
+            name='last_transition',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='django_dialog_engine.dialogstatetransition'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0021_dialog_current_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dialog',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
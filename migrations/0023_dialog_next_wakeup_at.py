@@ -0,0 +1,19 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0022_dialog_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dialog',
+            name='next_wakeup_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 13:40
+
+import sys
+
+from django.db import migrations, models
+
+if sys.version_info[0] > 2:
+    from django.db.models import JSONField # pylint: disable=no-name-in-module
+else:
+    from django.contrib.postgres.fields import JSONField
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0023_dialog_next_wakeup_at'),
+    ]
+
+    operations = [
+        # Existing dialogs start unseeded (NULL) - counts are loaded from their transitions on first use.
+        migrations.AddField(
+            model_name='dialog',
+            name='state_visits',
+            field=JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dialog',
+            name='state_visits',
+            field=JSONField(blank=True, default=dict, null=True),
+        ),
+    ]
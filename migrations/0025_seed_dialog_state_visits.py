@@ -0,0 +1,42 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 14:25
+
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+def seed_state_visits(apps, schema_editor):
+    Dialog = apps.get_model('django_dialog_engine', 'Dialog')
+    DialogStateTransition = apps.get_model('django_dialog_engine', 'DialogStateTransition')
+
+    # Active dialogs only - finished dialogs are seeded by backfill_dialog_state or on first use.
+    pending = Dialog.objects.filter(finished=None, state_visits__isnull=True).order_by('pk').values_list('pk', flat=True)
+
+    last_pk = 0
+
+    while True:
+        batch = list(pending.filter(pk__gt=last_pk)[:BATCH_SIZE])
+
+        if len(batch) == 0:
+            break
+
+        state_visits = {}
+
+        for dialog_id, state_id, count in DialogStateTransition.objects.filter(dialog_id__in=batch).order_by().values_list('dialog_id', 'state_id').annotate(count=Count('pk')):
+            state_visits.setdefault(dialog_id, {})[state_id] = count
+
+        for dialog_id in batch:
+            Dialog.objects.filter(pk=dialog_id).update(state_visits=state_visits.get(dialog_id, {}))
+
+        last_pk = batch[-1]
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0024_dialog_state_visits'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_state_visits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0025_seed_dialog_state_visits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dialogstatetransition',
+            name='reason',
+            field=models.CharField(blank=True, db_index=True, max_length=128, null=True),
+        ),
+    ]
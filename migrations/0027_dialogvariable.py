@@ -0,0 +1,33 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 16:02
+
+import sys
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+if sys.version_info[0] > 2:
+    from django.db.models import JSONField # pylint: disable=no-name-in-module
+else:
+    from django.contrib.postgres.fields import JSONField
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0026_dialogstatetransition_reason'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DialogVariable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=1024)),
+                ('value', JSONField(blank=True, null=True)),
+                ('dialog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dialog_variables', to='django_dialog_engine.dialog')),
+            ],
+            options={
+                'unique_together': {('dialog', 'key')},
+            },
+        ),
+    ]
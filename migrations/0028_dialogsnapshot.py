@@ -0,0 +1,41 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 20:34
+
+import sys
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_dialog_engine.fields
+
+if sys.version_info[0] > 2:
+    from django.db.models import JSONField # pylint: disable=no-name-in-module
+else:
+    from django.contrib.postgres.fields import JSONField
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0027_dialogvariable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DialogSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('definition', JSONField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='dialog',
+            name='dialog_snapshot',
+            field=django_dialog_engine.fields.SnapshotField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dialog',
+            name='snapshot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='dialogs', to='django_dialog_engine.dialogsnapshot'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 20:37
+
+from django.db import migrations
+import django_dialog_engine.fields
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0028_dialogsnapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dialogscript',
+            name='definition',
+            field=django_dialog_engine.fields.CompressedJSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dialogscriptversion',
+            name='definition',
+            field=django_dialog_engine.fields.CompressedJSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dialogsnapshot',
+            name='definition',
+            field=django_dialog_engine.fields.CompressedJSONField(),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# pylint: skip-file
+# Generated by Django 5.2.16 on 2026-10-17 20:41
+
+import sys
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_dialog_engine.fields
+
+if sys.version_info[0] > 2:
+    from django.db.models import JSONField # pylint: disable=no-name-in-module
+else:
+    from django.contrib.postgres.fields import JSONField
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dialog_engine', '0029_compressed_definitions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dialogscriptversion',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='dialogscriptversion',
+            name='delta',
+            field=JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dialogscriptversion',
+            name='keyframe',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deltas', to='django_dialog_engine.dialogscriptversion'),
+        ),
+        migrations.AlterField(
+            model_name='dialogscriptversion',
+            name='definition',
+            field=django_dialog_engine.fields.DeltaDefinitionField(blank=True, null=True),
+        ),
+    ]
@@ -1,7 +1,8 @@
-# pylint: disable=line-too-long, no-member, too-many-instance-attributes
+# pylint: disable=line-too-long, no-member, too-many-instance-attributes, too-many-lines
 # -*- coding: utf-8 -*-
 
-import importlib
+import contextlib
+import copy
 import logging
 import inspect
 import json
@@ -15,9 +16,9 @@ from six import python_2_unicode_compatible, string_types
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db import transaction
-from django.db.models import Q
-from django.db.models.signals import post_save, pre_save
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
@@ -28,15 +29,22 @@ except ImportError:
 
 from django.core.checks import Warning, register # pylint: disable=redefined-builtin
 from django.db import models
-from django.template import Template, Context
+from django.template import Context
 from django.template.exceptions import TemplateSyntaxError
 from django.urls import reverse
 from django.urls.exceptions import NoReverseMatch
 from django.utils import timezone
 from django.utils.html import mark_safe
 
-from .dialog import DialogMachine, ExternalChoiceNode, DialogError
+from .concurrency import DialogConflictError, concurrency_mode, record_contention, run_with_retries
+from .hooks import hooks_for
+from .middleware import UNKNOWN_USER, current_user
+from .dialog import DialogMachine, ExternalChoiceNode, DialogError, definition_delta, definition_hash, fetch_dialog_template, is_template, keyed_dialog_machine, next_random_generator
+from .fields import CompressedJSONField, DeltaDefinitionField, SnapshotField
 from .utils import urls_from_dict
+from .variables import variable_store
+
+STATEFUL_ACTIONS = ('store-value', 'update-value',)
 
 FINISH_REASONS = (
     ('not_finished', 'Not Finished'),
@@ -49,27 +57,32 @@ FINISH_REASONS = (
 
 _ = gettext.gettext
 
-# https://stackoverflow.com/a/75217303/193812
 def get_requested_user():
-    for frame_record in inspect.stack():
-        if frame_record[3] == 'get_response':
-            request = frame_record[0].f_locals['request']
-            return request.user
+    user = current_user() # Set by RequestedUserMiddleware or acting_user()
+
+    if user is not UNKNOWN_USER:
+        return user
+
+    # https://stackoverflow.com/a/75217303/193812 - fallback when the middleware is not installed. Walks frames
+    # directly, as inspect.stack() also reads source lines for every frame.
+
+    frame = inspect.currentframe()
+
+    while frame is not None:
+        if frame.f_code.co_name == 'get_response' and 'request' in frame.f_locals:
+            return frame.f_locals['request'].user
+
+        frame = frame.f_back
 
     return None
 
-def apply_template(obj, context_dict):
+def apply_template(obj, context_dict): # pylint: disable=too-many-return-statements
     if isinstance(obj, string_types):
-        prefix = ''
-
-        try:
-            for template_load in settings.DJANGO_DIALOG_ENGINE_TEMPLATE_LOADS:
-                prefix += '{%% load %s %%}' % template_load
-        except AttributeError:
-            pass
+        if is_template(obj) is False:
+            return obj
 
         try:
-            template = Template('%s{%% autoescape off %%}%s{%% endautoescape %%}' % (prefix, obj))
+            template = fetch_dialog_template(obj)
             context = Context(context_dict)
 
             return template.render(context)
@@ -115,7 +128,7 @@ class DialogScriptManager(models.Manager): # pylint: disable=too-few-public-meth
         return self.filter(query)
 
 @python_2_unicode_compatible
-class DialogScript(models.Model):
+class DialogScript(models.Model): # pylint: disable=too-many-public-methods
     class Meta: # pylint: disable=too-few-public-methods,old-style-class,no-init
         ordering = ['name',]
 
@@ -131,12 +144,17 @@ class DialogScript(models.Model):
 
     labels = models.TextField(max_length=(1024 * 1024), null=True, blank=True)
 
-    definition = JSONField(null=True, blank=True)
+    definition = CompressedJSONField(null=True, blank=True)
+
+    loaded_state = None # Field values (hashes for JSON fields) as of the last load or save - see changed_fields()
+
+    pending_version = None # Created in pre_save before this script had a primary key - attached in post_save.
+    saved_content_hash = None
 
     def fetch_urls(self):
         urls = []
 
-        for node in self.definition:
+        for node in self.definition: # pylint: disable=not-an-iterable
             node_urls = urls_from_dict(node)
 
             for url in node_urls:
@@ -301,54 +319,90 @@ class DialogScript(models.Model):
         return DialogMachine(self.definition, {})
 
     def broadcast_changes(self, updates):
-        for app in settings.INSTALLED_APPS:
+        for dialog_updated in hooks_for('dialog_updated'):
             try:
-                dialog_module = importlib.import_module('.dialog_api', package=app)
-
-                dialog_module.dialog_updated(self, timezone.now(), updates)
+                dialog_updated(self, timezone.now(), updates)
             except ImportError:
                 pass
             except AttributeError:
                 pass
 
-    def save(self, *args, **kwargs): # pylint: disable=arguments-differ, signature-differs
-        if self.pk:
-            cls = self.__class__
-            old = cls.objects.get(pk=self.pk)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(DialogScript, cls).from_db(db, field_names, values) # pylint: disable=super-with-arguments
 
-            new = self
+        if hooks_for('dialog_updated'):
+            instance.loaded_state = instance.field_state()
 
-            changed_fields = {}
+        return instance
 
-            for field in cls._meta.get_fields(): # pylint: disable=protected-access
-                field_name = field.name
+    def field_state(self):
+        state = {}
 
-                try:
-                    if getattr(old, field_name) != getattr(new, field_name):
-                        changed_fields[field_name] = {
-                            'original': getattr(old, field_name),
-                            'updated': getattr(new, field_name)
-                        }
+        deferred_fields = self.get_deferred_fields()
+
+        for field in self._meta.concrete_fields: # pylint: disable=protected-access
+            if field.primary_key is False and (field.attname in deferred_fields) is False:
+                value = getattr(self, field.attname)
+
+                if isinstance(field, JSONField):
+                    value = definition_hash(value) # Large definitions are compared by hash.
 
-                except Exception as ex: # nosec # pylint: disable=broad-except, unused-variable
-                    pass # Catch field does not exist exception
+                state[field.attname] = value
 
-            self.broadcast_changes(changed_fields)
+        return state
+
+    def changed_fields(self):
+        loaded_state = self.loaded_state
+
+        if loaded_state is None: # Not loaded while dialog_updated hooks were registered.
+            loaded_state = DialogScript.objects.get(pk=self.pk).field_state()
+
+        changed_fields = {}
+        hashed_fields = []
+
+        for attname, value in self.field_state().items():
+            if attname in loaded_state and loaded_state[attname] != value:
+                if isinstance(self._meta.get_field(attname), JSONField): # pylint: disable=protected-access
+                    hashed_fields.append(attname)
+                else:
+                    changed_fields[attname] = {
+                        'original': loaded_state[attname],
+                        'updated': value
+                    }
+
+        if hashed_fields:
+            originals = DialogScript.objects.filter(pk=self.pk).values(*hashed_fields).first()
+
+            for attname in hashed_fields:
+                changed_fields[attname] = {
+                    'original': originals[attname] if originals is not None else None,
+                    'updated': getattr(self, attname)
+                }
+
+        return changed_fields
+
+    def save(self, *args, **kwargs): # pylint: disable=arguments-differ, signature-differs
+        track_changes = len(hooks_for('dialog_updated')) > 0
+
+        if self.pk and track_changes:
+            self.broadcast_changes(self.changed_fields())
 
         super(DialogScript, self).save(*args, **kwargs) # pylint: disable=super-with-arguments
 
+        if track_changes:
+            self.loaded_state = self.field_state()
+
     def issues(self):
         issues = []
 
-        for app in settings.INSTALLED_APPS:
+        for identify_script_issues in hooks_for('identify_script_issues'):
             try:
-                dialog_module = importlib.import_module('.dialog_api', package=app)
-
-                issues.extend(dialog_module.identify_script_issues(self))
+                issues.extend(identify_script_issues(self))
             except ImportError:
-                pass # traceback.print_exc()
+                pass
             except AttributeError:
-                pass # traceback.print_exc()
+                pass
 
         return issues
 
@@ -370,15 +424,66 @@ class DialogScriptVersion(models.Model):
 
     labels = models.TextField(max_length=(1024 * 1024), null=True, blank=True)
 
-    definition = JSONField(null=True, blank=True)
+    definition = DeltaDefinitionField(null=True, blank=True) # Empty for delta versions - rebuilt from keyframe + delta.
+
+    content_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+    keyframe = models.ForeignKey('self', related_name='deltas', null=True, blank=True, on_delete=models.SET_NULL)
+    delta = JSONField(null=True, blank=True)
 
     def __str__(self):
         return '%s - %s (%s)' % (self.dialog_script, self.created, self.creator)
 
+    def version_hash(self):
+        if self.content_hash is None: # Written before versions were hashed.
+            self.content_hash = definition_hash(self.definition)
+
+            DialogScriptVersion.objects.filter(pk=self.pk).update(content_hash=self.content_hash)
+
+        return self.content_hash
+
+    def encode_definition(self, definition, previous=None):
+        self.definition = definition
+        self.delta = None
+        self.keyframe = None
+
+        if previous is None:
+            return
+
+        keyframe = previous
+
+        if previous.keyframe_id is not None:
+            keyframe = previous.keyframe
+
+        interval = getattr(settings, 'DJANGO_DIALOG_ENGINE_VERSION_KEYFRAME_INTERVAL', 10)
+
+        if interval < 2 or keyframe.deltas.count() >= (interval - 1):
+            return
+
+        delta = definition_delta(keyframe.definition, definition)
+
+        if delta is None or len(json.dumps(delta)) >= len(json.dumps(definition)):
+            return # Not encodable, or too different from the keyframe to be worth it.
+
+        self.definition = None
+        self.delta = delta
+        self.keyframe = keyframe
+
+    def materialize(self):
+        definition = self.definition
+
+        self.delta = None
+        self.keyframe = None
+        self.definition = definition
+
+        DialogScriptVersion.objects.filter(pk=self.pk).update(definition=definition, delta=None, keyframe=None)
+
     def get_absolute_url(self):
         return '/admin/django_dialog_engine/dialogscriptversion/%s/change' % self.pk
 
     def size(self):
+        if self.delta is not None and self.keyframe_id is not None:
+            return len(self.delta['order']) # Avoids rebuilding the definition.
+
         if self.definition is None:
             return 0
 
@@ -403,6 +508,18 @@ def normalize_newlines(sender, instance, **kwargs): # pylint: disable=unused-arg
 def create_version_update_updated(sender, instance, **kwargs): # pylint: disable=unused-argument
     instance.updated = timezone.now()
 
+    content_hash = definition_hash(instance.definition)
+
+    instance.saved_content_hash = content_hash
+
+    latest = None
+
+    if instance.pk is not None:
+        latest = DialogScriptVersion.objects.filter(dialog_script=instance).defer('definition').order_by('-updated', '-pk').first()
+
+    if latest is not None and latest.version_hash() == content_hash:
+        return # Label, archive & embeddable changes - definition unchanged.
+
     new_version = DialogScriptVersion()
     new_version.name = instance.name
     new_version.created = instance.created
@@ -410,25 +527,72 @@ def create_version_update_updated(sender, instance, **kwargs): # pylint: disable
     new_version.embeddable = instance.embeddable
     new_version.identifier = instance.identifier
     new_version.labels = instance.labels
-    new_version.definition = instance.definition
+    new_version.content_hash = content_hash
+    new_version.encode_definition(instance.definition, latest)
     new_version.creator = get_requested_user()
 
+    if instance.pk is not None:
+        new_version.dialog_script = instance
+    else:
+        instance.pending_version = new_version
+
     new_version.save()
 
+@receiver(pre_delete, sender=DialogScriptVersion)
+def materialize_dependent_versions(sender, instance, **kwargs): # pylint: disable=unused-argument
+    for dependent in instance.deltas.all():
+        dependent.keyframe = instance
+
+        dependent.materialize()
+
 @receiver(post_save, sender=DialogScript) # Added to attach version that could not be attached due to unsaved DialogScript in pre_save signal.
 def attach_version_update_updated(sender, instance, **kwargs): # pylint: disable=unused-argument
-    script_versions = DialogScriptVersion.objects.filter(dialog_script=None, identifier=instance.identifier, definition=instance.definition)
+    pending_version = instance.pending_version
+
+    if pending_version is not None:
+        instance.pending_version = None
+
+        pending_version.dialog_script = instance
+        pending_version.save(update_fields=['dialog_script'])
+
+    if instance.saved_content_hash is not None: # Orphaned versions, e.g. from a deleted script with the same identifier.
+        DialogScriptVersion.objects.filter(dialog_script=None, identifier=instance.identifier, content_hash=instance.saved_content_hash).update(dialog_script=instance)
+
+class DialogSnapshotManager(models.Manager): # pylint: disable=too-few-public-methods
+    def intern(self, definition):
+        content_hash = definition_hash(definition)
+
+        snapshot = self.filter(content_hash=content_hash).defer('definition').first()
 
-    for script_version in script_versions:
-        script_version.dialog_script = instance
-        script_version.save()
+        if snapshot is None:
+            snapshot = self.get_or_create(content_hash=content_hash, defaults={'definition': definition})[0]
+
+        return snapshot
+
+@python_2_unicode_compatible
+class DialogSnapshot(models.Model):
+    objects = DialogSnapshotManager()
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    definition = CompressedJSONField()
+
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return '%s' % self.content_hash
+
+def metadata_fingerprints(metadata):
+    # Top-level key -> hash of its canonical JSON, far cheaper to keep per loaded dialog than a deep copy.
+
+    return dict((key, hash(json.dumps(value, sort_keys=True, default=str)),) for key, value in metadata.items())
 
 @python_2_unicode_compatible
-class Dialog(models.Model):
+class Dialog(models.Model): # pylint: disable=too-many-public-methods
     key = models.CharField(null=True, blank=True, max_length=128)
 
     script = models.ForeignKey(DialogScript, related_name='dialogs', null=True, blank=True, on_delete=models.SET_NULL)
-    dialog_snapshot = JSONField(null=True, blank=True)
+    dialog_snapshot = SnapshotField(null=True, blank=True) # Empty once interned - reads resolve through snapshot.
+    snapshot = models.ForeignKey(DialogSnapshot, related_name='dialogs', null=True, blank=True, on_delete=models.PROTECT)
 
     started = models.DateTimeField()
     finished = models.DateTimeField(null=True, blank=True)
@@ -437,12 +601,42 @@ class Dialog(models.Model):
 
     metadata = JSONField(default=dict)
 
+    current_state = models.CharField(max_length=128, null=True, blank=True, db_index=True)
+    last_transition_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    last_transition = models.ForeignKey('DialogStateTransition', related_name='+', null=True, blank=True, on_delete=models.SET_NULL)
+
+    version = models.PositiveIntegerField(default=0)
+
+    next_wakeup_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    state_visits = JSONField(null=True, blank=True, default=dict) # state_id -> transition count, None until seeded.
+
+    # Maintained by update_dialog_current_state, update_next_wakeup, visit_counts, backfill_dialog_state & finish_processing - never written by save().
+    STATE_FIELDS = ('current_state', 'last_transition_at', 'last_transition', 'version', 'next_wakeup_at', 'state_visits',)
+
+    pending_transitions = () # Transitions created by an auto-advancing process() call, awaiting bulk insert.
+
+    metadata_buffer_depth = 0 # Variable changes are written once when the outermost buffered_metadata() block exits.
+    metadata_dirty = False
+    metadata_fingerprints = None # See metadata_fingerprints() - metadata as last read or written, to tell unsaved local edits apart in process().
+
+    variable_store = None # See DJANGO_DIALOG_ENGINE_VARIABLE_STORAGE & variables()
+
     def __str__(self):
         if self.script is not None:
             return self.script.name
 
         return 'dialog-%s' % self.pk
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Dialog, cls).from_db(db, field_names, values) # pylint: disable=super-with-arguments
+
+        if ('metadata' in instance.get_deferred_fields()) is False:
+            instance.metadata_fingerprints = metadata_fingerprints(instance.metadata)
+
+        return instance
+
     def is_valid(self):
         if self.script is None:
             return False
@@ -458,11 +652,9 @@ class Dialog(models.Model):
 
         self.save()
 
-        for app in settings.INSTALLED_APPS:
+        for finished_dialog in hooks_for('finished_dialog'):
             try:
-                dialog_module = importlib.import_module('.dialog_api', package=app)
-
-                dialog_module.finished_dialog(self)
+                finished_dialog(self)
             except ImportError:
                 pass
             except AttributeError:
@@ -471,14 +663,157 @@ class Dialog(models.Model):
     def is_active(self):
         return self.finished is None
 
-    @transaction.atomic
-    def process(self, response=None, extras=None, logger=None): # pylint: disable=too-many-statements, too-many-branches
+    def save(self, *args, **kwargs): # pylint: disable=arguments-differ, signature-differs
+        if self._state.adding is False and kwargs.get('update_fields', None) is None and kwargs.get('force_insert', False) is False:
+            update_fields = []
+
+            deferred_fields = self.get_deferred_fields()
+
+            for field in self._meta.concrete_fields: # pylint: disable=protected-access
+                if field.primary_key is False and (field.name in Dialog.STATE_FIELDS) is False and (field.attname in deferred_fields) is False:
+                    update_fields.append(field.name)
+
+            kwargs['update_fields'] = update_fields
+
+        if kwargs.get('update_fields', None) is not None and 'dialog_snapshot' in kwargs['update_fields'] and ('snapshot' in kwargs['update_fields']) is False:
+            kwargs['update_fields'] = list(kwargs['update_fields']) + ['snapshot'] # Interning the snapshot may repoint the foreign key.
+
+        if kwargs.get('update_fields', None) is None or 'metadata' in kwargs['update_fields']:
+            self.metadata_dirty = False
+            self.metadata_fingerprints = metadata_fingerprints(self.metadata)
+
+        super(Dialog, self).save(*args, **kwargs) # pylint: disable=super-with-arguments
+
+    def process(self, response=None, extras=None, logger=None, auto_advance=None):
+        mode = concurrency_mode(self._state.db or 'default')
+
+        if mode == 'none':
+            with transaction.atomic():
+                with self.buffered_metadata():
+                    return self.process_current(response, extras, logger, auto_advance)
+
+        original_extras = None
+
+        if extras is not None:
+            original_extras = dict(extras)
+
+        local_metadata = self.local_metadata_changes() # Captured once - retries must not treat rolled-back writes as local.
+
+        def attempt(number):
+            attempt_extras = extras
+
+            if number > 0 and original_extras is not None:
+                attempt_extras = dict(original_extras) # Earlier attempt merged in rolled-back metadata.
+
+            with transaction.atomic():
+                self.start_processing(mode, local_metadata)
+
+                with self.buffered_metadata():
+                    actions = self.process_current(response, attempt_extras, logger, auto_advance)
+
+                self.finish_processing(mode)
+
+                return actions
+
+        return run_with_retries(attempt, self.pk)
+
+    def start_processing(self, mode, local_metadata=None):
+        # Refreshes what other workers or a rolled-back attempt change - the state columns, metadata, the finish
+        # columns and a script switched elsewhere. Other unsaved local edits are kept, and unsaved top-level
+        # metadata keys (see local_metadata_changes) are reapplied over the fresh metadata instead of being discarded.
+
+        queryset = Dialog.objects.filter(pk=self.pk).only('metadata', 'finished', 'finish_reason', 'snapshot', *Dialog.STATE_FIELDS)
+
+        current = None
+
+        if mode == 'lock':
+            if connections[queryset.db].features.has_select_for_update_nowait:
+                try:
+                    with transaction.atomic():
+                        current = queryset.select_for_update(nowait=True).get()
+                except DatabaseError:
+                    record_contention('lock_wait', self.pk)
+
+            if current is None:
+                current = queryset.select_for_update().get()
+        else:
+            current = queryset.get()
+
+        self.metadata_dirty = False # Any buffered changes were rolled back with the previous attempt.
+        self.variable_store = None
+
+        if current.snapshot_id != self.snapshot_id and self._meta.get_field('dialog_snapshot').is_interned(self): # pylint: disable=protected-access
+            self.__dict__.pop('dialog_snapshot', None) # Script changed elsewhere - reload through the new snapshot.
+            setattr(self, 'snapshot_id', current.snapshot_id)
+
+        for field_name in Dialog.STATE_FIELDS:
+            attname = self._meta.get_field(field_name).attname # pylint: disable=protected-access
+
+            setattr(self, attname, getattr(current, attname))
+
+        self.finished = current.finished # Also undoes a finish from an attempt that lost the version check.
+        self.finish_reason = current.finish_reason
+
+        self.metadata_fingerprints = current.metadata_fingerprints
+
+        if local_metadata is not None:
+            changed, removed = local_metadata
+
+            current.metadata.update(copy.deepcopy(changed))
+
+            for key in removed:
+                current.metadata.pop(key, None)
+
+        self.metadata = current.metadata
+
+    def local_metadata_changes(self):
+        # Top-level metadata keys set or removed since the row was last read or written.
+
+        if self.metadata_fingerprints is None:
+            return (copy.deepcopy(self.metadata), [],)
+
+        changed = {}
+
+        fingerprints = metadata_fingerprints(self.metadata)
+
+        for key, fingerprint in fingerprints.items():
+            if self.metadata_fingerprints.get(key, None) != fingerprint:
+                changed[key] = copy.deepcopy(self.metadata[key])
+
+        removed = [key for key in self.metadata_fingerprints if (key in fingerprints) is False]
+
+        return (changed, removed,)
+
+    def finish_processing(self, mode):
+        if mode == 'version':
+            updated = Dialog.objects.filter(pk=self.pk, version=self.version).update(version=F('version') + 1)
+
+            if updated == 0:
+                raise DialogConflictError('Dialog %s was updated by another worker while processing.' % self.pk)
+
+            self.version += 1
+
+    def process_current(self, response=None, extras=None, logger=None, auto_advance=None): # pylint: disable=too-many-statements, too-many-branches, too-many-locals
         if extras is None:
             extras = {}
 
         if logger is None:
             logger = logging.getLogger()
 
+        if auto_advance is None:
+            auto_advance = getattr(settings, 'DJANGO_DIALOG_ENGINE_AUTO_ADVANCE', False)
+
+        max_steps = 1
+
+        if auto_advance:
+            max_steps = getattr(settings, 'DJANGO_DIALOG_ENGINE_AUTO_ADVANCE_MAX_STEPS', 100)
+
+        if ('values' in extras) is False:
+            template_values = self.variables().template_values()
+
+            if template_values is not None:
+                extras['values'] = template_values
+
         for key in self.metadata.keys():
             if (key in extras) is False:
                 extras[key] = self.metadata[key]
@@ -488,25 +823,41 @@ class Dialog(models.Model):
         if self.finished is not None:
             return actions
 
-        if self.dialog_snapshot is None:
+        if self.snapshot_id is None and self.dialog_snapshot is None:
             self.dialog_snapshot = self.script.definition
             self.save()
 
-        last_transition = self.transitions.order_by('-when').first()
+        last_transition = self.latest_transition()
+
+        if last_transition is not None:
+            last_transition.dialog = self
+
+        self.pending_transitions = []
+
+        transitioned = False
 
         try:
-            dialog_machine = DialogMachine(self.dialog_snapshot, self.metadata, django_object=self)
+            dialog_machine = self.dialog_machine(django_object=self)
 
             if last_transition is not None:
                 dialog_machine.advance_to(last_transition.state_id)
 
-            transition = dialog_machine.evaluate(response=response, last_transition=last_transition, extras=extras, logger=logger)
+            for step in range(0, max_steps):
+                if step > 0:
+                    response = None
+
+                transition = dialog_machine.evaluate(response=response, last_transition=last_transition, extras=extras, logger=logger)
+
+                if transition is None:
+                    break # Waiting for input or time
+
+                if last_transition is not None and last_transition.state_id == transition.new_state_id and transition.refresh is False:
+                    break
 
-            if transition is None:
-                pass # Nothing to do
-            elif last_transition is None or last_transition.state_id != transition.new_state_id or transition.refresh is True:
                 new_actions = []
 
+                transitioned = True
+
                 if transition.new_state_id is None:
                     self.finished = timezone.now()
                     self.finish_reason = 'dialog_concluded'
@@ -521,11 +872,15 @@ class Dialog(models.Model):
                     new_transition.when = timezone.now()
                     new_transition.state_id = transition.new_state_id
                     new_transition.metadata = transition.metadata
+                    new_transition.reason = new_transition.transition_reason()
 
                     if last_transition is not None:
                         new_transition.prior_state_id = last_transition.state_id
 
-                    new_transition.save()
+                    if auto_advance:
+                        self.pending_transitions.append(new_transition)
+                    else:
+                        new_transition.save()
 
                     logger.info('[process] Transitioning from %s to %s', new_transition.prior_state_id, transition.new_state_id)
 
@@ -542,10 +897,32 @@ class Dialog(models.Model):
 
                 actions.extend(new_actions)
 
+                if self.finished is not None or transition.refresh is True:
+                    break
+
+                if any(action.get('type', None) in STATEFUL_ACTIONS for action in new_actions):
+                    break # Embedding app must apply these before later nodes read them.
+
+                last_transition = new_transition
+
+                dialog_machine.advance_to(last_transition.state_id)
+            else:
+                if auto_advance:
+                    logger.warning('[process] Dialog %s stopped auto-advancing after %d steps.', self.pk, max_steps)
+
+            self.flush_pending_transitions()
+
+            if transitioned:
+                dialog_machine.advance_to(self.current_state_id())
+
+            self.update_next_wakeup(dialog_machine, include_due=transitioned)
+
             logger.debug('Returning actions to handler: %s', actions)
 
             return actions
         except DialogError:
+            self.flush_pending_transitions()
+
             logger.error('Encountered an issue in dialog %d:', self.pk)
             logger.error(traceback.print_exc())
             logger.error('Force-finishing %d.', self.pk)
@@ -554,12 +931,86 @@ class Dialog(models.Model):
 
             self.finish('dialog_error')
 
-            logger.debug('Returning empty actions to handler: %s', [])
+            logger.debug('Returning completed actions to handler: %s', actions)
 
-            return []
+            return actions
+
+    def flush_pending_transitions(self):
+        pending_transitions = self.pending_transitions
+
+        self.pending_transitions = []
+
+        if pending_transitions:
+            using = router.db_for_write(DialogStateTransition, instance=self)
+
+            for transition in pending_transitions:
+                transition.recorded_in_bulk = True
+
+                pre_save.send(sender=DialogStateTransition, instance=transition, raw=False, using=using, update_fields=None)
+
+            DialogStateTransition.objects.bulk_create(pending_transitions)
+
+            recorded = list(pending_transitions)
+
+            if recorded[-1].pk is None: # Backend does not return primary keys from bulk inserts.
+                latest = self.transitions.order_by('-when').first()
+                latest.dialog = self
+
+                recorded[-1] = latest
+
+            record_transitions(recorded)
+
+            for transition in pending_transitions: # bulk_create skips model signals - receivers still see every transition.
+                post_save.send(sender=DialogStateTransition, instance=transition, created=True, raw=False, using=using, update_fields=None)
+
+    def update_next_wakeup(self, dialog_machine, include_due=False):
+        next_wakeup_at = None
+
+        if self.finished is None:
+            next_wakeup_at = dialog_machine.next_wakeup(self.last_transition_at, self.started, timezone.now(), include_due)
+
+        if next_wakeup_at != self.next_wakeup_at:
+            Dialog.objects.filter(pk=self.pk).update(next_wakeup_at=next_wakeup_at)
+
+            self.next_wakeup_at = next_wakeup_at
+
+    def visit_counts(self):
+        if self.state_visits is None:
+            state_visits = {}
+
+            for state_id, count in self.transitions.order_by().values_list('state_id').annotate(count=Count('pk')):
+                state_visits[state_id] = count
+
+            Dialog.objects.filter(pk=self.pk).update(state_visits=state_visits)
+
+            self.state_visits = state_visits
+
+        return self.state_visits
+
+    def has_visited(self, state_id):
+        if self.visit_counts().get(state_id, 0) > 0:
+            return True
+
+        for transition in self.pending_transitions:
+            if transition.state_id == state_id:
+                return True
+
+        return False
+
+    def count_transitions(self, state_id):
+        count = self.visit_counts().get(state_id, 0)
+
+        for transition in self.pending_transitions:
+            if transition.state_id == state_id:
+                count += 1
+
+        return count
 
     def latest_transition(self):
-        return self.transitions.order_by('-when').first()
+        if self.last_transition_id is not None:
+            return self.last_transition
+
+        return self.transitions.order_by('-when').first() # New or not yet backfilled dialogs
 
     @transaction.atomic
     def advance_to(self, state_id):
@@ -579,10 +1030,12 @@ class Dialog(models.Model):
 
         logger.info('[advance_to] Transitioning from %s to %s', new_transition.prior_state_id, new_transition.state_id)
 
-        dialog_machine = DialogMachine(self.dialog_snapshot, self.metadata)
+        dialog_machine = self.dialog_machine()
 
         dialog_machine.advance_to(new_transition.state_id)
 
+        self.update_next_wakeup(dialog_machine, include_due=True)
+
         actions = dialog_machine.current_node.actions()
 
         if actions is None:
@@ -595,8 +1048,25 @@ class Dialog(models.Model):
 
         return actions
 
+    def snapshot_hash(self):
+        if Dialog.snapshot.is_cached(self):
+            return self.snapshot.content_hash
+
+        return DialogSnapshot.objects.filter(pk=self.snapshot_id).values_list('content_hash', flat=True).first()
+
+    def dialog_machine(self, django_object=None):
+        snapshot_field = Dialog._meta.get_field('dialog_snapshot') # pylint: disable=protected-access
+
+        if snapshot_field.is_interned(self):
+            return keyed_dialog_machine(self.snapshot_hash(), lambda: self.dialog_snapshot, self.metadata, django_object=django_object) # Skips loading the definition when compiled.
+
+        return keyed_dialog_machine(snapshot_field.content_hash(self), lambda: self.dialog_snapshot, self.metadata, django_object=django_object) # Legacy local copies are hashed once per value.
+
     def current_state_id(self):
-        last_transition = self.transitions.order_by('-when').first()
+        if self.last_transition_id is not None:
+            return self.current_state
+
+        last_transition = self.latest_transition()
 
         if last_transition is not None:
             return last_transition.state_id
@@ -606,9 +1076,9 @@ class Dialog(models.Model):
     def available_actions(self):
         actions = []
 
-        last_transition = self.transitions.order_by('-when').first()
+        last_transition = self.latest_transition()
 
-        dialog_machine = DialogMachine(self.dialog_snapshot, self.metadata)
+        dialog_machine = self.dialog_machine()
 
         if last_transition is not None:
             dialog_machine.advance_to(last_transition.state_id)
@@ -624,29 +1094,78 @@ class Dialog(models.Model):
     def prior_transitions(self, new_state_id, prior_state_id, reason=None):
         transitions = []
 
-        for transition in self.transitions.filter(state_id=new_state_id, prior_state_id=prior_state_id):
-            if reason is None or transition.metadata['reason'] == reason:
+        prior = self.transitions.filter(state_id=new_state_id, prior_state_id=prior_state_id)
+
+        if reason is not None:
+            prior = prior.filter(Q(reason=reason) | Q(reason=None)) # pylint: disable=unsupported-binary-operation
+
+        for transition in prior:
+            if reason is None or transition.transition_reason() == reason:
                 transitions.append(transition)
 
+        for transition in self.pending_transitions:
+            if transition.state_id == new_state_id and transition.prior_state_id == prior_state_id:
+                if reason is None or transition.reason == reason:
+                    transitions.append(transition)
+
         return transitions
 
-    def get_value(self, key):
-        if 'values' in self.metadata:
-            if key in self.metadata['values']:
-                return self.metadata['values'][key]
+    def count_prior_transitions(self, new_state_id, prior_state_id, reason=None):
+        prior = self.transitions.filter(state_id=new_state_id, prior_state_id=prior_state_id)
 
-        return None
+        if reason is None:
+            count = prior.count()
+        else:
+            counts = prior.aggregate(matched=Count('pk', filter=Q(reason=reason)), unknown=Count('pk', filter=Q(reason=None)))
 
-    def put_value(self, key, value):
-        if ('values' in self.metadata) is False:
-            self.metadata['values'] = {}
+            count = counts['matched']
+
+            if counts['unknown'] > 0: # Written before the reason column - see backfill_dialog_state.
+                for transition in prior.filter(reason=None):
+                    if transition.transition_reason() == reason:
+                        count += 1
 
-        if value is None and key in self.metadata['values']:
-            del self.metadata['values'][key]
+        for transition in self.pending_transitions:
+            if transition.state_id == new_state_id and transition.prior_state_id == prior_state_id:
+                if reason is None or transition.reason == reason:
+                    count += 1
+
+        return count
+
+    @contextlib.contextmanager
+    def buffered_metadata(self):
+        self.metadata_buffer_depth += 1
+
+        try:
+            yield
+
+            if self.metadata_buffer_depth == 1 and self.variable_store is not None:
+                self.variable_store.flush()
+        finally:
+            self.metadata_buffer_depth -= 1
+
+        if self.metadata_buffer_depth == 0 and self.metadata_dirty:
+            self.save(update_fields=['metadata'])
+
+    def save_metadata(self):
+        if self.metadata_buffer_depth > 0:
+            self.metadata_dirty = True
+        elif self.pk is None:
+            self.save()
         else:
-            self.metadata['values'][key] = value
+            self.save(update_fields=['metadata'])
 
-        self.save()
+    def variables(self):
+        if self.variable_store is None:
+            self.variable_store = variable_store(self)
+
+        return self.variable_store
+
+    def get_value(self, key):
+        return self.variables().get(key)
+
+    def put_value(self, key, value):
+        self.variables().put(key, value)
 
     def pop_value(self, key):
         value = self.get_value(key)
@@ -663,11 +1182,17 @@ class Dialog(models.Model):
 
             return None
         else:
-            del self.metadata['values'][key]
-            self.save()
+            self.put_value(key, None)
 
         return value
 
+    def random_generator(self):
+        generator = next_random_generator(self.metadata)
+
+        self.save_metadata()
+
+        return generator
+
     def push_value(self, key, value):
         list_value = self.get_value(key)
 
@@ -686,11 +1211,9 @@ class Dialog(models.Model):
 @receiver(post_save, sender=Dialog)
 def initialize_dialog(sender, instance, created, **kwargs): # pylint: disable=unused-argument, too-many-locals, too-many-branches
     while created is True:
-        for app in settings.INSTALLED_APPS:
+        for initialize_hook in hooks_for('initialize_dialog'):
             try:
-                dialog_module = importlib.import_module('.dialog_api', package=app)
-
-                dialog_module.initialize_dialog(instance)
+                initialize_hook(instance)
             except ImportError:
                 pass
             except AttributeError:
@@ -759,6 +1282,19 @@ def initialize_dialog(sender, instance, created, **kwargs): # pylint: disable=un
 
             instance.save()
 
+@python_2_unicode_compatible
+class DialogVariable(models.Model):
+    class Meta: # pylint: disable=too-few-public-methods, old-style-class, no-init
+        unique_together = (('dialog', 'key',),)
+
+    dialog = models.ForeignKey(Dialog, related_name='dialog_variables', on_delete=models.CASCADE)
+
+    key = models.CharField(max_length=1024)
+    value = JSONField(null=True, blank=True)
+
+    def __str__(self):
+        return '%s: %s' % (self.dialog, self.key)
+
 @python_2_unicode_compatible
 class DialogStateTransition(models.Model):
     dialog = models.ForeignKey(Dialog, related_name='transitions', null=True, on_delete=models.SET_NULL)
@@ -767,8 +1303,12 @@ class DialogStateTransition(models.Model):
     state_id = models.CharField(max_length=128, db_index=True)
     prior_state_id = models.CharField(max_length=128, null=True, blank=True, db_index=True)
 
+    reason = models.CharField(max_length=128, null=True, blank=True, db_index=True) # Copied from metadata on write, None until backfilled.
+
     metadata = JSONField(default=dict)
 
+    recorded_in_bulk = False # Set by Dialog.flush_pending_transitions, which records the whole batch at once.
+
     def __str__(self):
         return '%s -> %s' % (self.prior_state_id, self.state_id)
 
@@ -778,6 +1318,51 @@ class DialogStateTransition(models.Model):
 
         return []
 
+    def transition_reason(self):
+        if self.reason is not None:
+            return self.reason
+
+        if isinstance(self.metadata, dict):
+            return ('%s' % self.metadata.get('reason', ''))[:128]
+
+        return ''
+
+@receiver(pre_save, sender=DialogStateTransition)
+def populate_transition_reason(sender, instance, **kwargs): # pylint: disable=unused-argument
+    if instance.reason is None:
+        instance.reason = instance.transition_reason()
+
+def record_transitions(transitions):
+    # Visit counts are incremented on the locked row and the current state is only moved forward by the guarded
+    # UPDATE, so stale instances and late saves of older transitions never roll either back.
+
+    latest = max(transitions, key=lambda transition: transition.when)
+
+    with transaction.atomic():
+        dialog = Dialog.objects.select_for_update().only('pk', 'current_state', 'last_transition_at', 'last_transition', 'state_visits').get(pk=latest.dialog_id)
+
+        if dialog.state_visits is not None: # Seeded lazily by Dialog.visit_counts otherwise.
+            for transition in transitions:
+                dialog.state_visits[transition.state_id] = dialog.state_visits.get(transition.state_id, 0) + 1
+
+            Dialog.objects.filter(pk=dialog.pk).update(state_visits=dialog.state_visits)
+
+        current = Dialog.objects.filter(Q(last_transition_at=None) | Q(last_transition_at__lte=latest.when), pk=dialog.pk)
+
+        if current.update(current_state=latest.state_id, last_transition_at=latest.when, last_transition=latest) > 0:
+            dialog.current_state = latest.state_id
+            dialog.last_transition_at = latest.when
+            dialog.last_transition_id = latest.pk
+
+    if DialogStateTransition.dialog.is_cached(latest):
+        for attname in ('current_state', 'last_transition_at', 'last_transition_id', 'state_visits',):
+            setattr(latest.dialog, attname, copy.deepcopy(getattr(dialog, attname)))
+
+@receiver(post_save, sender=DialogStateTransition)
+def update_dialog_current_state(sender, instance, created, **kwargs): # pylint: disable=unused-argument
+    if created and instance.dialog_id is not None and instance.recorded_in_bulk is False:
+        record_transitions([instance])
+
 @register()
 def check_prettyjson_installed(app_configs, **kwargs): # pylint: disable=unused-argument
     errors = []
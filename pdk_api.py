@@ -41,7 +41,9 @@ def incremental_backup(parameters): # pylint: disable=too-many-locals, too-many-
     dumpdata_apps = (
         'django_dialog_engine.DialogScript',
         'django_dialog_engine.DialogStateTransition',
+        'django_dialog_engine.DialogSnapshot',
         'django_dialog_engine.Dialog',
+        'django_dialog_engine.DialogVariable',
     )
 
     if parameters['skip_apps']:
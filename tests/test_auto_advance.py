@@ -0,0 +1,114 @@
+# pylint: disable=line-too-long, no-member
+
+from django.db import connection
+from django.db.models.signals import post_save, pre_save
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Dialog, DialogStateTransition
+
+LOOP_SCRIPT = [{
+    'id': 'begin',
+    'type': 'begin',
+    'next_id': 'echo-a'
+}, {
+    'id': 'echo-a',
+    'type': 'echo',
+    'message': 'A',
+    'next_id': 'echo-b'
+}, {
+    'id': 'echo-b',
+    'type': 'echo',
+    'message': 'B',
+    'next_id': 'loop'
+}, {
+    'id': 'loop',
+    'type': 'loop',
+    'iterations': 2,
+    'loop_id': 'echo-a',
+    'next_id': 'record'
+}, {
+    'id': 'record',
+    'type': 'record-variable',
+    'key': 'looped',
+    'value': 'yes',
+    'next_id': 'prompt'
+}, {
+    'id': 'prompt',
+    'type': 'prompt',
+    'prompt': 'Done?',
+    'next_id': 'end'
+}, {
+    'id': 'end',
+    'type': 'end'
+}]
+
+class AutoAdvanceTestCase(TestCase):
+    def setUp(self):
+        self.dialog = Dialog.objects.create(dialog_snapshot=LOOP_SCRIPT, started=timezone.now())
+
+    def states(self):
+        return list(self.dialog.transitions.order_by('when', 'pk').values_list('state_id', flat=True))
+
+    def test_auto_advance_matches_steps(self):
+        stepped = Dialog.objects.create(dialog_snapshot=LOOP_SCRIPT, started=timezone.now())
+
+        stepped_actions = []
+
+        for _ in range(0, 8):
+            stepped_actions.extend(stepped.process(None))
+
+        actions = self.dialog.process(None, auto_advance=True)
+
+        self.assertEqual(actions, stepped_actions)
+        self.assertEqual([action['message'] for action in actions if action['type'] == 'echo'], ['A', 'B', 'A', 'B', 'Done?'])
+        self.assertIn({'type': 'store-value', 'key': 'looped', 'value': 'yes'}, actions)
+        self.assertEqual(self.states(), list(stepped.transitions.order_by('when', 'pk').values_list('state_id', flat=True)))
+        self.assertEqual(self.dialog.current_state_id(), 'prompt')
+        self.assertEqual(Dialog.objects.get(pk=self.dialog.pk).last_transition_id, self.dialog.transitions.order_by('-when').first().pk)
+
+        self.assertEqual(self.dialog.process(None, auto_advance=True), [])
+        self.assertEqual(len(self.states()), 8)
+
+    @override_settings(DJANGO_DIALOG_ENGINE_AUTO_ADVANCE=True, DJANGO_DIALOG_ENGINE_AUTO_ADVANCE_MAX_STEPS=3)
+    def test_auto_advance_max_steps(self):
+        self.dialog.process(None)
+
+        self.assertEqual(self.states(), ['echo-a', 'echo-b', 'loop'])
+
+        self.dialog.process(None)
+
+        self.assertEqual(self.states(), ['echo-a', 'echo-b', 'loop', 'echo-a', 'echo-b', 'loop'])
+
+    def test_loop_counts_no_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.dialog.process(None, auto_advance=True)
+
+        self.assertEqual(self.dialog.state_visits, {'echo-a': 2, 'echo-b': 2, 'loop': 2, 'record': 1, 'prompt': 1})
+
+        for query in context.captured_queries:
+            self.assertNotIn('COUNT', query['sql'].upper())
+
+    def test_auto_advance_signals(self):
+        seen = {'pre_save': [], 'post_save': []}
+
+        def pre_save_receiver(sender, instance, **kwargs): # pylint: disable=unused-argument
+            seen['pre_save'].append(instance.state_id)
+
+        def post_save_receiver(sender, instance, created, **kwargs): # pylint: disable=unused-argument
+            if created:
+                seen['post_save'].append(instance.state_id)
+
+        pre_save.connect(pre_save_receiver, sender=DialogStateTransition)
+        post_save.connect(post_save_receiver, sender=DialogStateTransition)
+
+        try:
+            self.dialog.process(None, auto_advance=True)
+        finally:
+            pre_save.disconnect(pre_save_receiver, sender=DialogStateTransition)
+            post_save.disconnect(post_save_receiver, sender=DialogStateTransition)
+
+        self.assertEqual(seen['pre_save'], self.states())
+        self.assertEqual(seen['post_save'], self.states())
+        self.assertEqual(self.dialog.state_visits, {'echo-a': 2, 'echo-b': 2, 'loop': 2, 'record': 1, 'prompt': 1})
@@ -0,0 +1,55 @@
+# pylint: disable=line-too-long, no-member
+
+from django.test import TestCase
+
+from ..dialog import DialogMachine
+
+class BranchConditionsTestCase(TestCase):
+    def setUp(self):
+        self.definition = [{
+            'id': 'begin',
+            'type': 'begin',
+            'next_id': 'conditions'
+        }, {
+            'id': 'conditions',
+            'type': 'branch-conditions',
+            'actions': [{
+                'condition': 'flagged',
+                'action': 'flagged-end'
+            }, {
+                'condition': 'score > 10 and len([answer for answer in answers if answer]) > 1',
+                'action': 'high-end'
+            }],
+            'no_match': 'no-match-end',
+            'error': 'error-end'
+        }, {
+            'id': 'flagged-end',
+            'type': 'end'
+        }, {
+            'id': 'high-end',
+            'type': 'end'
+        }, {
+            'id': 'no-match-end',
+            'type': 'end'
+        }, {
+            'id': 'error-end',
+            'type': 'end'
+        }]
+
+        self.machine = DialogMachine(self.definition)
+        self.machine.advance_to('conditions')
+
+    def evaluate(self, extras):
+        return self.machine.current_node.evaluate(self.machine, extras=extras).new_state_id
+
+    def test_conditions(self):
+        node = self.machine.current_node
+
+        self.assertEqual(node.compiled_conditions[0].free_names, frozenset(['flagged']))
+        self.assertEqual(node.compiled_conditions[1].free_names, frozenset(['score', 'answers']))
+
+        self.assertEqual(self.evaluate({}), 'no-match-end')
+        self.assertEqual(self.evaluate({'flagged': True}), 'flagged-end')
+        self.assertEqual(self.evaluate({'flagged': False, 'score': 20, 'answers': ['a', 'b']}), 'high-end')
+        self.assertEqual(self.evaluate({'flagged': False, 'score': 5, 'answers': []}), 'no-match-end')
+        self.assertEqual(self.evaluate({'flagged': False}), 'error-end')
@@ -0,0 +1,56 @@
+# pylint: disable=line-too-long, no-member
+
+import copy
+import json
+
+import six
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..fields import COMPRESSED_KEY
+from ..models import Dialog, DialogScript, DialogSnapshot
+from .test_snapshots import SNAPSHOT_SCRIPT
+
+def stored_value(model, field_name, row_id):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT %s FROM %s WHERE id = %%s' % (field_name, model._meta.db_table), [row_id]) # nosec # pylint: disable=protected-access
+
+        value = cursor.fetchone()[0]
+
+    if isinstance(value, six.string_types):
+        value = json.loads(value)
+
+    return value
+
+@override_settings(DJANGO_DIALOG_ENGINE_JSON_COMPRESSION='zlib', DJANGO_DIALOG_ENGINE_JSON_COMPRESSION_MIN_SIZE=0)
+class CompressedJSONTestCase(TestCase):
+    def test_definitions_compressed(self):
+        script = DialogScript.objects.create(name='Compressed', identifier='compressed', definition=copy.deepcopy(SNAPSHOT_SCRIPT))
+
+        self.assertEqual(stored_value(DialogScript, 'definition', script.pk)[COMPRESSED_KEY], 'zlib')
+        self.assertEqual(DialogScript.objects.get(pk=script.pk).definition, SNAPSHOT_SCRIPT)
+
+        dialog = Dialog.objects.create(script=script, dialog_snapshot=script.definition, started=timezone.now())
+
+        self.assertIn(COMPRESSED_KEY, stored_value(DialogSnapshot, 'definition', dialog.snapshot_id))
+
+        reloaded = Dialog.objects.get(pk=dialog.pk)
+        reloaded.process()
+
+        self.assertEqual(reloaded.current_state_id(), 'hello')
+
+    def test_rewrite_command(self):
+        script = DialogScript.objects.create(name='Compressed', identifier='compressed', definition=copy.deepcopy(SNAPSHOT_SCRIPT))
+
+        with override_settings(DJANGO_DIALOG_ENGINE_JSON_COMPRESSION=None):
+            call_command('compress_dialog_json', stdout=six.StringIO())
+
+            self.assertEqual(stored_value(DialogScript, 'definition', script.pk), SNAPSHOT_SCRIPT)
+
+        call_command('compress_dialog_json', batch_size=1, stdout=six.StringIO())
+
+        self.assertIn(COMPRESSED_KEY, stored_value(DialogScript, 'definition', script.pk))
+        self.assertEqual(DialogScript.objects.get(pk=script.pk).definition, SNAPSHOT_SCRIPT)
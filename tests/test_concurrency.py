@@ -0,0 +1,105 @@
+# pylint: disable=line-too-long, no-member
+
+import io
+import json
+
+from unittest import mock
+
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..concurrency import CONTENTION, DialogConflictError
+from ..models import Dialog
+from .test_snapshots import SNAPSHOT_SCRIPT
+
+class ConcurrencyTestCase(TestCase):
+    def setUp(self):
+        CONTENTION.clear()
+
+        with io.open('django_dialog_engine/tests/scripts/interrupt_script.json', encoding='utf8') as definition_file:
+            self.dialog = Dialog.objects.create(dialog_snapshot=json.load(definition_file), started=timezone.now())
+
+    def competing_worker(self, times):
+        original = Dialog.latest_transition
+        remaining = [times]
+
+        def latest_transition(dialog):
+            if remaining[0] > 0:
+                remaining[0] -= 1
+
+                Dialog.objects.filter(pk=dialog.pk).update(version=F('version') + 1)
+
+            return original(dialog)
+
+        return latest_transition
+
+    @override_settings(DJANGO_DIALOG_ENGINE_CONCURRENCY='version', DJANGO_DIALOG_ENGINE_CONCURRENCY_BACKOFF=0)
+    def test_version_conflict_retries(self):
+        with mock.patch.object(Dialog, 'latest_transition', self.competing_worker(1)):
+            self.dialog.process(None)
+
+        self.assertEqual(self.dialog.transitions.count(), 1)
+        self.assertEqual(self.dialog.current_state_id(), 'echo-1')
+        self.assertEqual(Dialog.objects.get(pk=self.dialog.pk).version, 1)
+        self.assertEqual(CONTENTION.stats(), {'conflict': 1})
+
+    @override_settings(DJANGO_DIALOG_ENGINE_CONCURRENCY='version', DJANGO_DIALOG_ENGINE_CONCURRENCY_RETRIES=0)
+    def test_version_conflict_exhausted(self):
+        with mock.patch.object(Dialog, 'latest_transition', self.competing_worker(1)):
+            with self.assertRaises(DialogConflictError):
+                self.dialog.process(None)
+
+        self.assertEqual(self.dialog.transitions.count(), 0)
+        self.assertEqual(CONTENTION.stats(), {'conflict': 1, 'exhausted': 1})
+
+    @override_settings(DJANGO_DIALOG_ENGINE_CONCURRENCY='lock')
+    def test_lock_refreshes_dialog(self):
+        stale = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.dialog.process(None)
+
+        stale.process(None)
+
+        self.assertEqual(stale.current_state_id(), 'test-variable')
+        self.assertEqual(self.dialog.transitions.count(), 2)
+
+    @override_settings(DJANGO_DIALOG_ENGINE_CONCURRENCY='lock')
+    def test_lock_keeps_local_metadata(self):
+        Dialog.objects.filter(pk=self.dialog.pk).update(metadata={'remote': True})
+
+        self.dialog.metadata['channel'] = 'sms'
+
+        extras = {}
+
+        self.dialog.process(None, extras=extras)
+
+        self.assertEqual(extras['channel'], 'sms')
+        self.assertEqual(self.dialog.metadata['channel'], 'sms')
+        self.assertTrue(self.dialog.metadata['remote'])
+        self.assertEqual(self.dialog.current_state_id(), 'echo-1')
+
+    @override_settings(DJANGO_DIALOG_ENGINE_CONCURRENCY='version', DJANGO_DIALOG_ENGINE_CONCURRENCY_BACKOFF=0)
+    def test_retry_keeps_local_metadata(self):
+        self.dialog.metadata['channel'] = 'sms'
+
+        with mock.patch.object(Dialog, 'latest_transition', self.competing_worker(1)):
+            self.dialog.process(None)
+
+        self.assertEqual(self.dialog.metadata['channel'], 'sms')
+        self.assertEqual(CONTENTION.stats(), {'conflict': 1})
+
+    @override_settings(DJANGO_DIALOG_ENGINE_CONCURRENCY='version', DJANGO_DIALOG_ENGINE_CONCURRENCY_BACKOFF=0)
+    def test_retry_after_lost_finish(self):
+        dialog = Dialog.objects.create(dialog_snapshot=SNAPSHOT_SCRIPT, started=timezone.now())
+
+        dialog.process(None)
+        dialog.process(None)
+
+        with mock.patch.object(Dialog, 'latest_transition', self.competing_worker(1)):
+            dialog.process(None)
+
+        self.assertEqual(CONTENTION.stats(), {'conflict': 1})
+        self.assertIsNotNone(dialog.finished)
+        self.assertEqual(Dialog.objects.get(pk=dialog.pk).finished, dialog.finished)
+        self.assertEqual(Dialog.objects.get(pk=dialog.pk).finish_reason, 'dialog_concluded')
@@ -0,0 +1,58 @@
+# pylint: disable=line-too-long, no-member
+
+from django.test import TestCase
+
+from ..dialog import MACHINE_CACHE, DialogMachine, cached_dialog_machine
+from ..dialog.custom_node import CODE_CACHE
+
+class CustomNodeTestCase(TestCase):
+    def setUp(self):
+        CODE_CACHE.clear()
+
+        self.definition = [{
+            'id': 'begin',
+            'type': 'begin',
+            'next_id': 'custom'
+        }, {
+            'id': 'custom',
+            'type': 'custom',
+            'definition': {'target': 'end'},
+            'evaluate': "result['details'] = {'reason': 'custom'}\nresult['next_id'] = definition['target']\nresult['actions'] = [{'type': 'echo', 'message': response}]",
+            'actions': "actions.append({'type': 'echo', 'message': 'Say something'})"
+        }, {
+            'id': 'end',
+            'type': 'end'
+        }]
+
+    def test_scripts_compiled_once(self):
+        for response in ('first', 'second', 'third'):
+            machine = DialogMachine(self.definition)
+            machine.advance_to('custom')
+
+            transition = machine.current_node.evaluate(machine, response=response)
+
+            self.assertEqual(transition.new_state_id, 'end')
+            self.assertEqual(transition.metadata['exit_actions'][0]['message'], response)
+            self.assertEqual(machine.current_node.actions()[0]['message'], 'Say something')
+
+        stats = CODE_CACHE.stats()
+
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['hits'], 4)
+
+    def test_scripts_get_own_definition(self):
+        MACHINE_CACHE.clear()
+
+        self.definition[1]['evaluate'] = "definition['target'] = 'custom'\nresult['details'] = {}\nresult['next_id'] = 'end'"
+        self.definition[1]['actions'] = "definition['target'] = 'custom'\nactions.append({'type': 'echo', 'message': definition['target']})"
+
+        first = cached_dialog_machine(self.definition, {})
+        first.advance_to('custom')
+
+        first.current_node.evaluate(first, response='first')
+        first.current_node.actions()
+
+        second = cached_dialog_machine(self.definition, {})
+        second.advance_to('custom')
+
+        self.assertEqual(second.current_node.definition, {'target': 'end'})
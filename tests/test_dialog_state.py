@@ -0,0 +1,117 @@
+# pylint: disable=line-too-long, no-member
+
+import datetime
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Dialog, DialogStateTransition
+
+class DialogStateTestCase(TestCase):
+    def setUp(self):
+        with io.open('django_dialog_engine/tests/scripts/interrupt_script.json', encoding='utf8') as definition_file:
+            self.dialog = Dialog.objects.create(dialog_snapshot=json.load(definition_file), started=timezone.now())
+
+    def test_state_follows_transitions(self):
+        self.dialog.process(None)
+        self.dialog.process(None)
+
+        latest = self.dialog.transitions.order_by('-when').first()
+
+        self.assertEqual(self.dialog.current_state, 'test-variable')
+        self.assertEqual(self.dialog.last_transition_id, latest.pk)
+
+        reloaded = Dialog.objects.get(pk=self.dialog.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(reloaded.current_state_id(), 'test-variable')
+
+        self.assertEqual(reloaded.last_transition_at, latest.when)
+        self.assertEqual(reloaded.latest_transition().pk, latest.pk)
+
+    def test_stale_save_keeps_state(self):
+        stale = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.dialog.process(None)
+
+        stale.metadata['touched'] = True
+        stale.save()
+
+        self.assertEqual(Dialog.objects.get(pk=self.dialog.pk).current_state, 'echo-1')
+
+    def test_stale_advance_counts(self):
+        self.dialog.visit_counts()
+
+        stale = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.dialog.advance_to('echo-1')
+        stale.advance_to('test-variable')
+
+        reloaded = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.assertEqual(reloaded.state_visits, {'echo-1': 1, 'test-variable': 1})
+        self.assertEqual(reloaded.current_state, 'test-variable')
+        self.assertEqual(stale.state_visits, reloaded.state_visits)
+
+    def test_late_older_transition(self):
+        stale = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.dialog.advance_to('test-variable')
+
+        DialogStateTransition.objects.create(dialog=stale, state_id='echo-1', when=timezone.now() - datetime.timedelta(minutes=5))
+
+        reloaded = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.assertEqual(reloaded.current_state, 'test-variable')
+        self.assertEqual(stale.current_state, 'test-variable')
+
+    def test_backfill_dialog_state(self):
+        self.dialog.process(None)
+        self.dialog.process(None)
+
+        Dialog.objects.filter(pk=self.dialog.pk).update(current_state=None, last_transition_at=None, last_transition=None)
+
+        reloaded = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.assertEqual(reloaded.current_state_id(), 'test-variable')
+
+        call_command('backfill_dialog_state', batch_size=1)
+
+        reloaded = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.assertEqual(reloaded.current_state, 'test-variable')
+        self.assertEqual(reloaded.last_transition_id, self.dialog.transitions.order_by('-when').first().pk)
+
+    def test_backfill_seeds_visits(self):
+        self.dialog.process(None)
+        self.dialog.process(None)
+
+        Dialog.objects.filter(pk=self.dialog.pk).update(state_visits=None)
+
+        call_command('backfill_dialog_state')
+
+        self.assertEqual(Dialog.objects.get(pk=self.dialog.pk).state_visits, {'echo-1': 1, 'test-variable': 1})
+
+    def test_prior_transition_reasons(self):
+        for reason in ('timeout', 'timeout', 'valid-response'):
+            DialogStateTransition.objects.create(dialog=self.dialog, when=timezone.now(), state_id='retry', prior_state_id='question', metadata={'reason': reason})
+
+        self.assertEqual(DialogStateTransition.objects.filter(reason='timeout').count(), 2)
+
+        legacy = self.dialog.transitions.filter(reason='timeout').first()
+
+        DialogStateTransition.objects.filter(pk=legacy.pk).update(reason=None)
+
+        self.assertEqual(self.dialog.count_prior_transitions('retry', 'question', 'timeout'), 2)
+        self.assertEqual(self.dialog.count_prior_transitions('retry', 'question'), 3)
+        self.assertEqual(len(self.dialog.prior_transitions('retry', 'question', 'timeout')), 2)
+
+        call_command('backfill_dialog_state')
+
+        self.assertEqual(DialogStateTransition.objects.get(pk=legacy.pk).reason, 'timeout')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.dialog.count_prior_transitions('retry', 'question', 'timeout'), 2)
@@ -6,7 +6,8 @@ import json
 from django.test import TestCase
 from django.utils import timezone
 
-from ..models import Dialog
+from ..dialog import DialogMachine
+from ..models import Dialog, DialogScript
 
 class InterruptsTestCase(TestCase):
     def setUp(self):
@@ -17,6 +18,8 @@ class InterruptsTestCase(TestCase):
             self.dialog_with_interrupt = Dialog.objects.create(dialog_snapshot=dialog_definition, started=timezone.now())
             self.dialog_with_interrupt_force_top = Dialog.objects.create(dialog_snapshot=dialog_definition, started=timezone.now())
 
+        self.dialog_definition = dialog_definition
+
         with io.open('django_dialog_engine/tests/scripts/interrupt_script_nested.json', encoding='utf8') as nested_file:
             nested_definition = json.load(nested_file)
 
@@ -233,3 +236,24 @@ class InterruptsTestCase(TestCase):
         self.assertEqual(self.dialog_with_interrupt_nested.finish_reason, 'dialog_concluded')
 
         self.assertIsNotNone(self.dialog_with_interrupt_nested.finished)
+
+    def test_invalid_pattern_skipped(self):
+        for node_def in self.dialog_definition:
+            if node_def['type'] == 'interrupt':
+                node_def['match_patterns'].insert(0, '(unbalanced')
+
+        with self.assertLogs('django_dialog_engine.dialog.base_node', level='WARNING'):
+            DialogMachine(self.dialog_definition)
+
+        script = DialogScript.objects.create(name='Invalid Pattern', identifier='invalid-pattern', definition=self.dialog_definition)
+
+        self.assertTrue(any('(unbalanced' in message for level, message in script.issues() if level == 'error'))
+
+        dialog = Dialog.objects.create(script=script, dialog_snapshot=self.dialog_definition, started=timezone.now())
+
+        dialog.process(None)
+        dialog.process(None)
+        dialog.process('foo should trigger interrupt')
+
+        self.assertIsNone(dialog.finished)
+        self.assertEqual(dialog.current_state_id(), 'interrupt-start')
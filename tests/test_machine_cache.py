@@ -0,0 +1,64 @@
+# pylint: disable=line-too-long, no-member
+
+import io
+import json
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..dialog import MACHINE_CACHE, DialogError, cached_dialog_machine
+from ..models import Dialog
+
+class MachineCacheTestCase(TestCase):
+    def setUp(self):
+        MACHINE_CACHE.clear()
+
+        with io.open('django_dialog_engine/tests/scripts/interrupt_script.json', encoding='utf8') as definition_file:
+            self.definition = json.load(definition_file)
+
+    def test_machines_share_nodes(self):
+        first = cached_dialog_machine(self.definition, {'first': True})
+        second = cached_dialog_machine(json.loads(json.dumps(self.definition)), {'second': True})
+
+        self.assertIs(first.all_nodes, second.all_nodes)
+        self.assertEqual(first.metadata, {'first': True})
+        self.assertEqual(second.metadata, {'second': True})
+
+        first.advance_to('echo-1')
+
+        self.assertEqual(first.current_node.node_id, 'echo-1')
+        self.assertEqual(second.current_node.node_type(), 'begin')
+
+        stats = MACHINE_CACHE.stats()
+
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+        with self.assertRaises(DialogError):
+            first.prefix_nodes('prefix__')
+
+    @override_settings(DJANGO_DIALOG_ENGINE_MACHINE_CACHE_SIZE=1)
+    def test_cache_evicts_least_recent(self):
+        cached_dialog_machine(self.definition)
+
+        other_definition = [node for node in self.definition if node['type'] != 'interrupt']
+
+        cached_dialog_machine(other_definition)
+
+        stats = MACHINE_CACHE.stats()
+
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['evictions'], 1)
+
+    def test_dialogs_use_cached_machine(self):
+        first = Dialog.objects.create(dialog_snapshot=self.definition, started=timezone.now())
+        second = Dialog.objects.create(dialog_snapshot=self.definition, started=timezone.now())
+
+        first.process(None)
+        first.process(None)
+        second.process(None)
+
+        self.assertEqual(first.current_state_id(), 'test-variable')
+        self.assertEqual(second.current_state_id(), 'echo-1')
+
+        self.assertGreater(MACHINE_CACHE.stats()['hits'], 0)
@@ -0,0 +1,61 @@
+# pylint: disable=line-too-long, no-member
+
+import io
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Dialog
+
+def metadata_writes(context):
+    writes = 0
+
+    for query in context.captured_queries:
+        sql = query['sql'].upper()
+
+        if sql.startswith('UPDATE') and '"METADATA"' in sql:
+            writes += 1
+
+    return writes
+
+class MetadataBufferTestCase(TestCase):
+    def setUp(self):
+        with io.open('django_dialog_engine/tests/scripts/interrupt_script.json', encoding='utf8') as definition_file:
+            self.dialog = Dialog.objects.create(dialog_snapshot=json.load(definition_file), started=timezone.now())
+
+    def test_buffered_values_write_once(self):
+        with self.assertNumQueries(1):
+            with self.dialog.buffered_metadata():
+                self.dialog.push_value('stack', 'first')
+                self.dialog.push_value('stack', 'second')
+                self.dialog.put_value('answer', 42)
+
+                self.assertEqual(self.dialog.pop_value('stack'), 'second')
+
+        reloaded = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.assertEqual(reloaded.get_value('stack'), ['first'])
+        self.assertEqual(reloaded.get_value('answer'), 42)
+
+        with self.assertNumQueries(1):
+            self.dialog.put_value('answer', 43)
+
+    def test_one_write_per_message(self):
+        dialog = self.dialog # interrupt-resume pops with force_top, emptying the stack.
+
+        dialog.process(None)
+        dialog.process(None)
+
+        dialog.put_value('django_dialog_engine_interrupt_node_stack', ['echo-1', 'test-variable'])
+
+        dialog.advance_to('interrupt-resume')
+
+        with CaptureQueriesContext(connection) as context:
+            dialog.process(None)
+
+        self.assertEqual(dialog.current_state_id(), 'echo-1')
+        self.assertEqual(metadata_writes(context), 1)
+        self.assertEqual(Dialog.objects.get(pk=dialog.pk).get_value('django_dialog_engine_interrupt_node_stack'), [])
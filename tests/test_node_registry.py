@@ -0,0 +1,76 @@
+# pylint: disable=line-too-long, no-member
+
+from django.test import TestCase
+
+from ..dialog import BaseNode, DialogError, DialogMachine, DialogTransition, EchoNode, NODE_TYPES, node_class_for_type, register_node_type
+
+class ShoutNode(BaseNode):
+    @staticmethod
+    def parse(dialog_def):
+        if dialog_def['type'] == 'shout':
+            return ShoutNode(dialog_def['id'], dialog_def['next_id'], dialog_def['message'])
+
+        return None
+
+    def __init__(self, node_id, next_node_id, message):
+        super().__init__(node_id, next_node_id)
+
+        self.message = message
+
+    def node_type(self):
+        return 'shout'
+
+    def evaluate(self, dialog, response=None, last_transition=None, extras=None, logger=None): # pylint: disable=too-many-arguments
+        transition = DialogTransition(new_state_id=self.next_node_id)
+
+        transition.metadata['reason'] = 'shout-continue'
+
+        return transition
+
+    def actions(self):
+        return [{
+            'type': 'echo',
+            'message': self.message.upper()
+        }]
+
+class NodeRegistryTestCase(TestCase):
+    def setUp(self):
+        self.definition = [{
+            'id': 'begin',
+            'type': 'begin',
+            'next_id': 'shout'
+        }, {
+            'id': 'shout',
+            'type': 'shout',
+            'message': 'hello',
+            'next_id': 'end'
+        }, {
+            'id': 'end',
+            'type': 'end'
+        }]
+
+    def tearDown(self):
+        NODE_TYPES.pop('shout', None)
+
+    def test_builtin_types_registered(self):
+        self.assertIs(node_class_for_type('echo'), EchoNode)
+
+    def test_registered_custom_type(self):
+        register_node_type('shout', ShoutNode)
+
+        machine = DialogMachine(self.definition)
+
+        self.assertIsInstance(machine.fetch_node('shout'), ShoutNode)
+
+    def test_unregistered_subclass_probed_once(self): # pylint: disable=invalid-name
+        with self.assertLogs('django_dialog_engine.dialog.base_node', level='WARNING'):
+            machine = DialogMachine(self.definition)
+
+        self.assertIsInstance(machine.fetch_node('shout'), ShoutNode)
+        self.assertIs(NODE_TYPES['shout'], ShoutNode)
+
+    def test_unknown_type(self):
+        self.definition[1]['type'] = 'whisper'
+
+        with self.assertRaises(DialogError):
+            DialogMachine(self.definition)
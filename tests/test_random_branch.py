@@ -0,0 +1,108 @@
+# pylint: disable=line-too-long, no-member
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..dialog import DialogMachine, RANDOM_STATE_KEY
+from ..models import Dialog
+
+class RandomBranchTestCase(TestCase):
+    def setUp(self):
+        self.definition = [{
+            'id': 'begin',
+            'type': 'begin',
+            'next_id': 'branch'
+        }, {
+            'id': 'branch',
+            'type': 'random-branch',
+            'actions': [{
+                'action': 'heads',
+                'weight': 3
+            }, {
+                'action': 'tails',
+                'weight': '1'
+            }, {
+                'action': 'edge',
+                'weight': 0
+            }]
+        }, {
+            'id': 'heads',
+            'type': 'end'
+        }, {
+            'id': 'tails',
+            'type': 'end'
+        }, {
+            'id': 'edge',
+            'type': 'end'
+        }]
+
+    def test_constant_weights_use_alias_table(self): # pylint: disable=invalid-name
+        machine = DialogMachine(self.definition)
+        machine.advance_to('branch')
+
+        self.assertIsNotNone(machine.current_node.alias_table)
+
+        counts = {}
+
+        for _ in range(0, 4000):
+            transition = machine.current_node.evaluate(machine, extras={})
+
+            counts[transition.new_state_id] = counts.get(transition.new_state_id, 0) + 1
+
+        self.assertNotIn('edge', counts)
+        self.assertAlmostEqual(counts['heads'] / 4000.0, 0.75, delta=0.05)
+
+    def test_template_weights_use_metadata(self): # pylint: disable=invalid-name
+        self.definition[1]['actions'][0]['weight'] = '{{ heads_weight }}'
+
+        machine = DialogMachine(self.definition, {'heads_weight': 0})
+        machine.advance_to('branch')
+
+        self.assertIsNone(machine.current_node.alias_table)
+
+        for _ in range(0, 20):
+            transition = machine.current_node.evaluate(machine, extras={'unrelated': True})
+
+            self.assertEqual(transition.new_state_id, 'tails')
+            self.assertEqual(transition.metadata['weights']['tails']['rendered_weight'], 1.0)
+
+    def test_seeded_draws_replay(self):
+        sequences = []
+
+        for _ in range(0, 2):
+            machine = DialogMachine(self.definition, {RANDOM_STATE_KEY: {'seed': 1234, 'draws': 0}})
+            machine.advance_to('branch')
+
+            sequences.append([machine.current_node.evaluate(machine, extras={}).new_state_id for _ in range(0, 25)])
+
+            self.assertEqual(machine.metadata[RANDOM_STATE_KEY]['draws'], 25)
+
+        self.assertEqual(sequences[0], sequences[1])
+
+    @override_settings(DJANGO_DIALOG_ENGINE_RANDOM_BACKEND='numpy')
+    def test_numpy_draws_replay(self):
+        try:
+            import numpy # pylint: disable=import-outside-toplevel, unused-import
+        except ImportError:
+            self.skipTest('numpy not installed')
+
+        self.test_seeded_draws_replay()
+
+        machine = DialogMachine(self.definition, {RANDOM_STATE_KEY: {'seed': 1234, 'draws': 0}})
+        machine.advance_to('branch')
+
+        states = [machine.current_node.evaluate(machine, extras={}).new_state_id for _ in range(0, 400)]
+
+        self.assertNotIn('edge', states)
+        self.assertEqual(len(set(states)), 2)
+
+    def test_dialog_persists_draws(self):
+        dialog = Dialog.objects.create(dialog_snapshot=self.definition, started=timezone.now())
+
+        dialog.process(None)
+        dialog.process(None)
+
+        dialog.refresh_from_db()
+
+        self.assertEqual(dialog.metadata[RANDOM_STATE_KEY]['draws'], 1)
+        self.assertIn(dialog.current_state_id(), ('heads', 'tails'))
@@ -0,0 +1,53 @@
+# pylint: disable=line-too-long, no-member
+
+import copy
+import threading
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+
+from .. import middleware as middleware_module
+from ..middleware import RequestedUserMiddleware, ThreadLocalVariable, UNKNOWN_USER, acting_user
+from ..models import DialogScript, get_requested_user
+from .test_snapshots import SNAPSHOT_SCRIPT
+
+class RequestedUserTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create(username='script-editor')
+
+    def test_acting_user_is_creator(self):
+        self.assertIsNone(get_requested_user())
+
+        with acting_user(self.user):
+            script = DialogScript.objects.create(name='Edited', identifier='edited', definition=copy.deepcopy(SNAPSHOT_SCRIPT))
+
+        self.assertEqual(script.versions.get().creator, self.user)
+        self.assertIsNone(get_requested_user())
+
+    def test_middleware_sets_user(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+
+        middleware = RequestedUserMiddleware(lambda request: get_requested_user())
+
+        self.assertEqual(middleware(request), self.user)
+        self.assertIsNone(get_requested_user())
+
+    def test_thread_local_fallback(self):
+        holder = ThreadLocalVariable('django_dialog_engine_requested_user', default=UNKNOWN_USER)
+
+        with mock.patch.object(middleware_module, 'REQUESTED_USER', holder):
+            with acting_user(self.user):
+                self.assertEqual(get_requested_user(), self.user)
+
+                seen = []
+
+                worker = threading.Thread(target=lambda: seen.append(middleware_module.current_user()))
+                worker.start()
+                worker.join()
+
+                self.assertIs(seen[0], UNKNOWN_USER)
+
+            self.assertIs(middleware_module.current_user(), UNKNOWN_USER)
@@ -0,0 +1,61 @@
+# pylint: disable=line-too-long, no-member
+
+import copy
+
+from unittest import mock
+
+from django.test import TestCase
+
+from .. import hooks
+from ..models import DialogScript
+from .test_snapshots import SNAPSHOT_SCRIPT
+
+class ScriptChangesTestCase(TestCase):
+    def setUp(self):
+        self.script = DialogScript.objects.create(name='Tracked', identifier='tracked', definition=copy.deepcopy(SNAPSHOT_SCRIPT))
+
+        self.updates = []
+
+    def record_update(self, script, when, updates): # pylint: disable=unused-argument
+        self.updates.append(updates)
+
+    def test_no_hooks_no_select(self):
+        script = DialogScript.objects.get(pk=self.script.pk)
+        script.name = 'Renamed'
+
+        with mock.patch.object(hooks, '_HOOKS', {'dialog_updated': []}):
+            self.assertIsNone(DialogScript.objects.get(pk=self.script.pk).loaded_state)
+
+            with self.assertNumQueries(3): # Latest version, script update & orphaned version lookup - no re-fetch.
+                script.save()
+
+    def test_changes_broadcast(self):
+        with mock.patch.object(hooks, '_HOOKS', {'dialog_updated': [self.record_update]}):
+            script = DialogScript.objects.get(pk=self.script.pk)
+
+            script.name = 'Renamed'
+            script.save()
+
+            script.definition[1]['message'] = 'Changed in place'
+            script.save()
+
+            script.save()
+
+        self.assertEqual(self.updates[0], {'name': {'original': 'Tracked', 'updated': 'Renamed'}})
+        self.assertEqual(list(self.updates[1].keys()), ['definition'])
+        self.assertEqual(self.updates[1]['definition']['original'], SNAPSHOT_SCRIPT)
+        self.assertEqual(self.updates[1]['definition']['updated'][1]['message'], 'Changed in place')
+        self.assertEqual(self.updates[2], {})
+
+    def test_hook_attribute_errors(self):
+        def broken_hook(script, when, updates): # pylint: disable=unused-argument
+            raise AttributeError('dialog_api helper missing')
+
+        with mock.patch.object(hooks, '_HOOKS', {'dialog_updated': [broken_hook, self.record_update]}):
+            script = DialogScript.objects.get(pk=self.script.pk)
+
+            script.name = 'Renamed'
+            script.save()
+
+        self.assertEqual(DialogScript.objects.get(pk=self.script.pk).name, 'Renamed')
+        self.assertEqual(len(self.updates), 1)
@@ -0,0 +1,89 @@
+# pylint: disable=line-too-long, no-member
+
+import copy
+
+import six
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..dialog import definition_hash
+from ..models import DialogScript, DialogScriptVersion
+from .test_snapshots import SNAPSHOT_SCRIPT
+
+def revised_script(message):
+    definition = copy.deepcopy(SNAPSHOT_SCRIPT)
+    definition[1]['message'] = message
+
+    return definition
+
+@override_settings(DJANGO_DIALOG_ENGINE_VERSION_KEYFRAME_INTERVAL=3)
+class ScriptVersionTestCase(TestCase):
+    def setUp(self):
+        self.script = DialogScript.objects.create(name='Versioned', identifier='versioned', definition=copy.deepcopy(SNAPSHOT_SCRIPT))
+
+    def test_versions_attached(self):
+        self.assertEqual(list(self.script.versions.values_list('content_hash', flat=True)), [definition_hash(SNAPSHOT_SCRIPT)])
+
+        self.script.delete()
+
+        self.assertEqual(DialogScriptVersion.objects.filter(dialog_script=None).count(), 1)
+
+        recreated = DialogScript.objects.create(name='Versioned', identifier='versioned', definition=copy.deepcopy(SNAPSHOT_SCRIPT))
+
+        self.assertEqual(recreated.versions.count(), 2)
+        self.assertIsNone(recreated.pending_version)
+
+    def test_unchanged_saves_skipped(self):
+        self.script.add_label('archived')
+        self.script.embeddable = True
+        self.script.save()
+
+        self.assertEqual(self.script.versions.count(), 1)
+
+    def test_versions_delta_encoded(self):
+        for index in range(0, 4):
+            self.script.definition = revised_script('Hello %d' % index)
+            self.script.save()
+
+        versions = list(DialogScriptVersion.objects.filter(dialog_script=self.script).order_by('updated', 'pk'))
+
+        self.assertEqual([version.keyframe_id is None for version in versions], [True, False, False, True, False])
+        self.assertEqual(versions[1].delta['nodes'], {'hello': revised_script('Hello 0')[1]})
+
+        reloaded = DialogScriptVersion.objects.get(pk=versions[2].pk)
+
+        self.assertEqual(reloaded.definition, revised_script('Hello 1'))
+        self.assertEqual(reloaded.size(), 3)
+
+        reloaded.restore_version()
+
+        self.assertEqual(DialogScript.objects.get(pk=self.script.pk).definition, revised_script('Hello 1'))
+
+    def test_keyframe_delete_rebuilds(self):
+        self.script.definition = revised_script('Changed')
+        self.script.save()
+
+        keyframe, delta = DialogScriptVersion.objects.filter(dialog_script=self.script).order_by('updated', 'pk')
+
+        keyframe.delete()
+
+        delta = DialogScriptVersion.objects.get(pk=delta.pk)
+
+        self.assertIsNone(delta.keyframe_id)
+        self.assertEqual(delta.definition, revised_script('Changed'))
+
+    def test_compact_versions(self):
+        with override_settings(DJANGO_DIALOG_ENGINE_VERSION_KEYFRAME_INTERVAL=1):
+            for index in range(0, 2):
+                self.script.definition = revised_script('Hello %d' % index)
+                self.script.save()
+
+        self.assertEqual(DialogScriptVersion.objects.filter(dialog_script=self.script, keyframe=None).count(), 3)
+
+        call_command('compact_dialog_script_versions', stdout=six.StringIO())
+
+        versions = list(DialogScriptVersion.objects.filter(dialog_script=self.script).order_by('updated', 'pk'))
+
+        self.assertEqual([version.keyframe_id for version in versions], [None, versions[0].pk, versions[0].pk])
+        self.assertEqual(versions[2].definition, revised_script('Hello 1'))
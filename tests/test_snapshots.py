@@ -0,0 +1,123 @@
+# pylint: disable=line-too-long, no-member
+
+import copy
+
+from unittest import mock
+
+import six
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import fields
+from ..dialog import MACHINE_CACHE, definition_hash
+from ..models import Dialog, DialogSnapshot
+
+SNAPSHOT_SCRIPT = [{
+    'id': 'begin',
+    'type': 'begin',
+    'next_id': 'hello'
+}, {
+    'id': 'hello',
+    'type': 'echo',
+    'message': 'Hello',
+    'next_id': 'end'
+}, {
+    'id': 'end',
+    'type': 'end'
+}]
+
+class DialogSnapshotTestCase(TestCase):
+    def setUp(self):
+        MACHINE_CACHE.clear()
+
+    def test_snapshots_are_shared(self):
+        first = Dialog.objects.create(dialog_snapshot=copy.deepcopy(SNAPSHOT_SCRIPT), started=timezone.now())
+        second = Dialog.objects.create(dialog_snapshot=copy.deepcopy(SNAPSHOT_SCRIPT), started=timezone.now())
+
+        self.assertEqual(DialogSnapshot.objects.count(), 1)
+        self.assertEqual(first.snapshot_id, second.snapshot_id)
+
+        self.assertEqual(Dialog.objects.filter(dialog_snapshot__isnull=True).count(), 2)
+
+        reloaded = Dialog.objects.get(pk=first.pk)
+
+        self.assertEqual(reloaded.dialog_snapshot, SNAPSHOT_SCRIPT)
+
+        reloaded.dialog_snapshot = reloaded.dialog_snapshot + [{'id': 'extra', 'type': 'end'}]
+        reloaded.save()
+
+        self.assertEqual(DialogSnapshot.objects.count(), 2)
+        self.assertNotEqual(Dialog.objects.get(pk=first.pk).snapshot_id, second.snapshot_id)
+
+    def test_in_place_edit_reinterns(self):
+        dialog = Dialog.objects.create(dialog_snapshot=copy.deepcopy(SNAPSHOT_SCRIPT), started=timezone.now())
+        dialog = Dialog.objects.get(pk=dialog.pk)
+
+        dialog.dialog_snapshot[1]['message'] = 'CHANGED'
+        dialog.save()
+
+        self.assertEqual(Dialog.objects.get(pk=dialog.pk).dialog_snapshot[1]['message'], 'CHANGED')
+        self.assertEqual(DialogSnapshot.objects.count(), 2)
+
+    def test_machine_keyed_by_snapshot(self):
+        dialog = Dialog.objects.create(dialog_snapshot=copy.deepcopy(SNAPSHOT_SCRIPT), started=timezone.now())
+
+        dialog.process()
+
+        self.assertEqual(dialog.current_state_id(), 'hello')
+
+        reloaded = Dialog.objects.get(pk=dialog.pk)
+
+        with self.assertNumQueries(1): # Snapshot hash only - the compiled machine is cached.
+            machine = reloaded.dialog_machine()
+
+        self.assertEqual(MACHINE_CACHE.stats()['size'], 1)
+        self.assertEqual(machine.current_node.node_type(), 'begin')
+
+    def test_snapshot_hashed_once(self):
+        dialog = Dialog.objects.create(dialog_snapshot=copy.deepcopy(SNAPSHOT_SCRIPT), started=timezone.now())
+
+        reloaded = Dialog.objects.get(pk=dialog.pk)
+
+        self.assertEqual(reloaded.dialog_snapshot, SNAPSHOT_SCRIPT)
+
+        Dialog.objects.filter(pk=dialog.pk).update(snapshot=None, dialog_snapshot=SNAPSHOT_SCRIPT)
+
+        legacy = Dialog.objects.get(pk=dialog.pk)
+
+        with mock.patch.object(fields, 'definition_hash', wraps=definition_hash) as hashed:
+            reloaded.dialog_machine()
+            reloaded.dialog_machine()
+            reloaded.metadata['touched'] = True
+            reloaded.save(update_fields=['metadata'])
+
+            self.assertEqual(hashed.call_count, 0)
+
+            legacy.dialog_machine()
+            legacy.dialog_machine()
+
+            self.assertEqual(hashed.call_count, 1)
+
+        reloaded.dialog_snapshot = copy.deepcopy(SNAPSHOT_SCRIPT)
+        reloaded.dialog_snapshot[1]['message'] = 'Reassigned'
+
+        self.assertFalse(Dialog._meta.get_field('dialog_snapshot').is_interned(reloaded)) # pylint: disable=protected-access
+
+    def test_dedup_legacy_snapshots(self):
+        dialogs = [Dialog.objects.create(dialog_snapshot=copy.deepcopy(SNAPSHOT_SCRIPT), started=timezone.now()) for index in range(0, 3)]
+
+        Dialog.objects.all().update(snapshot=None, dialog_snapshot=SNAPSHOT_SCRIPT) # Rows written before DialogSnapshot existed.
+        DialogSnapshot.objects.all().delete()
+
+        legacy = Dialog.objects.get(pk=dialogs[0].pk)
+
+        self.assertEqual(legacy.dialog_snapshot, SNAPSHOT_SCRIPT)
+
+        call_command('dedup_dialog_snapshots', batch_size=2, stdout=six.StringIO())
+
+        self.assertEqual(DialogSnapshot.objects.count(), 1)
+        self.assertEqual(Dialog.objects.filter(dialog_snapshot__isnull=True, snapshot__isnull=False).count(), 3)
+
+        self.assertEqual(Dialog.objects.get(pk=dialogs[2].pk).dialog_snapshot, SNAPSHOT_SCRIPT)
@@ -0,0 +1,30 @@
+# pylint: disable=line-too-long, no-member
+
+from django.test import TestCase
+
+from ..dialog import TEMPLATE_CACHE
+from ..models import apply_template
+
+class TemplatesTestCase(TestCase):
+    def setUp(self):
+        TEMPLATE_CACHE.clear()
+
+    def test_plain_strings_not_rendered(self):
+        actions = [{
+            'type': 'echo',
+            'message': 'Hello <b>world</b>'
+        }]
+
+        self.assertEqual(apply_template(actions, {}), actions)
+        self.assertEqual(TEMPLATE_CACHE.stats()['misses'], 0)
+
+    def test_templates_compiled_once(self):
+        for name in ('Ada', 'Grace'):
+            rendered = apply_template({'message': 'Hello {{ name }} & goodbye'}, {'name': name})
+
+            self.assertEqual(rendered['message'], 'Hello %s & goodbye' % name)
+
+        stats = TEMPLATE_CACHE.stats()
+
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
@@ -0,0 +1,74 @@
+# pylint: disable=line-too-long, no-member
+
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Dialog
+
+def reminder_script(count):
+    definition = [{
+        'id': 'begin',
+        'type': 'begin',
+        'next_id': 'question'
+    }, {
+        'id': 'question',
+        'type': 'prompt',
+        'prompt': 'Still there?',
+        'next_id': 'end'
+    }, {
+        'id': 'end',
+        'type': 'end'
+    }]
+
+    for index in range(0, count):
+        definition.append({
+            'id': 'reminder-%d' % index,
+            'type': 'time-elapsed-interrupt',
+            'hours_elapsed': 1 + index,
+            'minutes_elapsed': 0,
+            'next_id': 'question'
+        })
+
+    return definition
+
+class TimeElapsedTestCase(TestCase):
+    def setUp(self):
+        self.dialog = Dialog.objects.create(dialog_snapshot=reminder_script(10), started=timezone.now() - datetime.timedelta(hours=3, minutes=30))
+
+    def test_fired_skip_queries(self):
+        self.dialog.process(None)
+
+        fired = []
+
+        for _ in range(0, 6):
+            self.dialog.process(None)
+
+            fired.append(self.dialog.current_state_id())
+
+        self.assertEqual(fired, ['reminder-0', 'reminder-1', 'reminder-2', 'question', 'question', 'question'])
+        self.assertEqual(self.dialog.state_visits['question'], 2)
+
+        with CaptureQueriesContext(connection) as context:
+            self.dialog.process(None)
+
+        self.assertEqual(self.dialog.current_state_id(), 'question')
+
+        for query in context.captured_queries:
+            self.assertNotIn('COUNT', query['sql'].upper())
+
+    def test_unseeded_visits_load_once(self):
+        self.dialog.process(None)
+        self.dialog.process(None)
+
+        Dialog.objects.filter(pk=self.dialog.pk).update(state_visits=None)
+
+        dialog = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.assertTrue(dialog.has_visited('reminder-0'))
+        self.assertFalse(dialog.has_visited('reminder-1'))
+
+        self.assertEqual(Dialog.objects.get(pk=self.dialog.pk).state_visits, {'question': 1, 'reminder-0': 1})
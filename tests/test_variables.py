@@ -0,0 +1,113 @@
+# pylint: disable=line-too-long, no-member
+
+import json
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..docker_api import export_dialogs, import_dialogs
+from ..models import Dialog, DialogVariable
+
+VARIABLE_SCRIPT = [{
+    'id': 'begin',
+    'type': 'begin',
+    'next_id': 'check'
+}, {
+    'id': 'check',
+    'type': 'if',
+    'all_true': [{
+        'key': 'score',
+        'condition': '>',
+        'value': 10
+    }],
+    'next_id': 'high',
+    'false_id': 'low',
+}, {
+    'id': 'high',
+    'type': 'echo',
+    'message': 'High score from {{ values.name }}: {{ values.score }}',
+    'next_id': 'end'
+}, {
+    'id': 'low',
+    'type': 'echo',
+    'message': 'Low score',
+    'next_id': 'end'
+}, {
+    'id': 'end',
+    'type': 'end'
+}]
+
+@override_settings(DJANGO_DIALOG_ENGINE_VARIABLE_STORAGE='table')
+class VariableTableTestCase(TestCase):
+    def setUp(self):
+        self.dialog = Dialog.objects.create(dialog_snapshot=VARIABLE_SCRIPT, started=timezone.now(), metadata={'values': {'name': 'legacy'}})
+
+    def test_values_stored_per_key(self):
+        self.dialog.put_value('score', 12)
+        self.dialog.push_value('answers', 'yes')
+        self.dialog.push_value('answers', 'no')
+
+        self.assertEqual(self.dialog.pop_value('answers'), 'no')
+
+        self.assertEqual(dict(DialogVariable.objects.filter(dialog=self.dialog).values_list('key', 'value')), {'score': 12, 'answers': ['yes']})
+        self.assertNotIn('score', Dialog.objects.get(pk=self.dialog.pk).metadata['values'])
+
+        reloaded = Dialog.objects.get(pk=self.dialog.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(reloaded.get_value('score'), 12)
+            self.assertEqual(reloaded.get_value('score'), 12)
+
+        self.assertEqual(reloaded.get_value('name'), 'legacy')
+
+        reloaded.put_value('name', 'moved')
+
+        self.assertEqual(Dialog.objects.get(pk=self.dialog.pk).metadata['values'], {})
+
+        reloaded.put_value('score', None)
+
+        self.assertFalse(DialogVariable.objects.filter(dialog=self.dialog, key='score').exists())
+
+    def test_process_reads_table_values(self):
+        self.dialog.put_value('score', 12)
+
+        self.dialog.process(None)
+        self.dialog.process(None)
+
+        self.assertEqual(self.dialog.current_state_id(), 'high')
+
+        actions = self.dialog.process(None)
+
+        self.assertEqual(actions[0]['message'], 'High score from legacy: 12')
+
+    def test_template_values_cached(self):
+        self.dialog.put_value('score', 12)
+
+        values = self.dialog.variables().template_values()
+
+        self.assertEqual(values['score'], 12)
+
+        store = self.dialog.variables()
+        loaded = store.set_values()
+
+        self.assertIs(store.set_values(), loaded)
+        self.assertEqual(values['name'], 'legacy')
+
+        self.dialog.put_value('score', 13)
+
+        self.assertEqual(values['score'], 13)
+
+    def test_export_keeps_variables(self):
+        self.dialog.put_value('score', 12)
+
+        exported = export_dialogs(Dialog.objects.filter(pk=self.dialog.pk))
+
+        self.assertEqual(exported[0]['variables'], {'score': 12})
+
+        import_dialogs(ContentFile(json.dumps(exported).encode('utf-8')))
+
+        imported = Dialog.objects.exclude(pk=self.dialog.pk).get()
+
+        self.assertEqual(imported.get_value('score'), 12)
+        self.assertEqual(imported.get_value('name'), 'legacy')
@@ -0,0 +1,100 @@
+# pylint: disable=line-too-long, no-member
+
+import datetime
+
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Dialog
+from ..management.commands import process_dialog_wakeups
+
+PAUSE_SCRIPT = [{
+    'id': 'begin',
+    'type': 'begin',
+    'next_id': 'pause'
+}, {
+    'id': 'pause',
+    'type': 'pause',
+    'duration': 60,
+    'next_id': 'echo'
+}, {
+    'id': 'echo',
+    'type': 'echo',
+    'message': 'Welcome back.',
+    'next_id': 'end'
+}, {
+    'id': 'reminder',
+    'type': 'time-elapsed-interrupt',
+    'hours_elapsed': 2,
+    'minutes_elapsed': 30,
+    'next_id': 'end'
+}, {
+    'id': 'end',
+    'type': 'end'
+}]
+
+class WakeupTestCase(TestCase):
+    def setUp(self):
+        self.dialog = Dialog.objects.create(dialog_snapshot=PAUSE_SCRIPT, started=timezone.now())
+
+    def test_pause_schedules_wakeup(self):
+        self.dialog.process(None)
+
+        self.assertEqual(self.dialog.current_state_id(), 'pause')
+        self.assertEqual(Dialog.objects.get(pk=self.dialog.pk).next_wakeup_at, self.dialog.last_transition_at + datetime.timedelta(seconds=60))
+
+        self.dialog.process(None)
+
+        self.assertEqual(self.dialog.next_wakeup_at, self.dialog.last_transition_at + datetime.timedelta(seconds=60))
+
+    def test_sweep_processes_due(self):
+        waiting = Dialog.objects.create(dialog_snapshot=PAUSE_SCRIPT, started=timezone.now())
+
+        self.dialog.process(None)
+        waiting.process(None)
+
+        earlier = timezone.now() - datetime.timedelta(seconds=120)
+
+        self.dialog.transitions.update(when=earlier)
+        Dialog.objects.filter(pk=self.dialog.pk).update(last_transition_at=earlier, next_wakeup_at=earlier + datetime.timedelta(seconds=60))
+
+        call_command('process_dialog_wakeups')
+
+        dialog = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.assertEqual(dialog.current_state_id(), 'echo')
+        self.assertEqual(dialog.next_wakeup_at, dialog.started + datetime.timedelta(hours=2, minutes=30))
+        self.assertEqual(Dialog.objects.get(pk=waiting.pk).current_state_id(), 'pause')
+
+    def test_sweep_keeps_failed_due(self):
+        self.dialog.process(None)
+
+        earlier = timezone.now() - datetime.timedelta(seconds=120)
+        due = earlier + datetime.timedelta(seconds=60)
+
+        self.dialog.transitions.update(when=earlier)
+        Dialog.objects.filter(pk=self.dialog.pk).update(last_transition_at=earlier, next_wakeup_at=due)
+
+        with mock.patch.object(process_dialog_wakeups, 'wake_dialog', side_effect=ValueError('Delivery failed.')):
+            with self.assertLogs(process_dialog_wakeups.__name__, level='ERROR'):
+                call_command('process_dialog_wakeups')
+
+        self.assertEqual(Dialog.objects.get(pk=self.dialog.pk).next_wakeup_at, due)
+
+        call_command('process_dialog_wakeups')
+
+        self.assertEqual(Dialog.objects.get(pk=self.dialog.pk).current_state_id(), 'echo')
+
+    def test_backfill_schedules_wakeups(self):
+        self.dialog.process(None)
+
+        Dialog.objects.filter(pk=self.dialog.pk).update(next_wakeup_at=None)
+
+        call_command('backfill_dialog_state')
+
+        dialog = Dialog.objects.get(pk=self.dialog.pk)
+
+        self.assertEqual(dialog.next_wakeup_at, dialog.last_transition_at + datetime.timedelta(seconds=60))
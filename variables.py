@@ -0,0 +1,149 @@
+# pylint: disable=line-too-long, useless-object-inheritance, no-member
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping # pylint: disable=deprecated-class
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+class MetadataVariableStore(object):
+    def __init__(self, dialog):
+        self.dialog = dialog
+
+    def get(self, key):
+        if 'values' in self.dialog.metadata:
+            if key in self.dialog.metadata['values']:
+                return self.dialog.metadata['values'][key]
+
+        return None
+
+    def put(self, key, value):
+        metadata = self.dialog.metadata
+
+        if ('values' in metadata) is False:
+            metadata['values'] = {}
+
+        if value is None and key in metadata['values']:
+            del metadata['values'][key]
+        else:
+            metadata['values'][key] = value
+
+        self.dialog.save_metadata()
+
+    def template_values(self): # pylint: disable=no-self-use
+        return None # Already part of the dialog metadata.
+
+    def flush(self):
+        pass
+
+class LazyValues(Mapping):
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, key):
+        return self.store.set_values()[key]
+
+    def __iter__(self):
+        return iter(self.store.set_values())
+
+    def __len__(self):
+        return len(self.store.set_values())
+
+class TableVariableStore(object):
+    def __init__(self, dialog):
+        self.dialog = dialog
+
+        self.cache = {}
+        self.dirty = set()
+        self.loaded = False
+        self.filtered = None # Variables with values, rebuilt after put().
+
+    def legacy_values(self):
+        return self.dialog.metadata.get('values', {})
+
+    def get(self, key):
+        if (key in self.cache) is False:
+            from .models import DialogVariable # pylint: disable=import-outside-toplevel, cyclic-import
+
+            stored = list(DialogVariable.objects.filter(dialog=self.dialog, key=key).values_list('value', flat=True)[:1])
+
+            if stored:
+                self.cache[key] = stored[0]
+            else:
+                self.cache[key] = self.legacy_values().get(key, None)
+
+        return self.cache[key]
+
+    def put(self, key, value):
+        self.cache[key] = value
+        self.filtered = None
+
+        if self.dialog.metadata_buffer_depth > 0:
+            self.dirty.add(key)
+        else:
+            self.write(key)
+
+    def write(self, key):
+        from .models import DialogVariable # pylint: disable=import-outside-toplevel, cyclic-import
+
+        value = self.cache.get(key, None)
+
+        if value is None:
+            DialogVariable.objects.filter(dialog=self.dialog, key=key).delete()
+        elif DialogVariable.objects.filter(dialog=self.dialog, key=key).update(value=value) == 0:
+            DialogVariable.objects.create(dialog=self.dialog, key=key, value=value)
+
+        if key in self.legacy_values():
+            del self.dialog.metadata['values'][key] # Superseded by the table row.
+
+            self.dialog.save_metadata()
+
+    def set_values(self):
+        if self.loaded is False:
+            from .models import DialogVariable # pylint: disable=import-outside-toplevel, cyclic-import
+
+            values = dict(self.legacy_values())
+
+            for key, value in DialogVariable.objects.filter(dialog=self.dialog).values_list('key', 'value'):
+                values[key] = value
+
+            values.update(self.cache)
+
+            self.cache = values
+            self.loaded = True
+
+        if self.filtered is None:
+            self.filtered = dict((key, value) for key, value in self.cache.items() if value is not None)
+
+        return self.filtered
+
+    def values(self):
+        return dict(self.set_values())
+
+    def template_values(self):
+        return LazyValues(self)
+
+    def flush(self):
+        dirty = self.dirty
+
+        self.dirty = set()
+
+        for key in sorted(dirty):
+            self.write(key)
+
+VARIABLE_STORES = {
+    'metadata': MetadataVariableStore,
+    'table': TableVariableStore,
+}
+
+def variable_store(dialog):
+    backend = getattr(settings, 'DJANGO_DIALOG_ENGINE_VARIABLE_STORAGE', 'metadata')
+
+    store_class = VARIABLE_STORES.get(backend, None)
+
+    if store_class is None:
+        store_class = import_string(backend)
+
+    return store_class(dialog)